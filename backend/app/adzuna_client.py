@@ -0,0 +1,109 @@
+"""Shared async HTTP client for all Adzuna API traffic"""
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+from dotenv import load_dotenv
+from app.cache import AsyncTTLCache
+
+load_dotenv()
+
+ADZUNA_BASE_URL = "https://api.adzuna.com/v1/api"
+
+# Connection pool configuration
+ADZUNA_TIMEOUT = float(os.getenv("ADZUNA_TIMEOUT", "10"))
+ADZUNA_POOL_LIMIT = int(os.getenv("ADZUNA_POOL_LIMIT", "100"))
+ADZUNA_POOL_LIMIT_PER_HOST = int(os.getenv("ADZUNA_POOL_LIMIT_PER_HOST", "20"))
+ADZUNA_DNS_TTL = int(os.getenv("ADZUNA_DNS_TTL", "300"))
+ADZUNA_KEEPALIVE_TIMEOUT = float(os.getenv("ADZUNA_KEEPALIVE_TIMEOUT", "30"))
+
+# Response cache configuration (TTL of 0 disables caching)
+ADZUNA_CACHE_TTL = float(os.getenv("ADZUNA_CACHE_TTL", "300"))
+ADZUNA_CACHE_MAX_ENTRIES = int(os.getenv("ADZUNA_CACHE_MAX_ENTRIES", "1024"))
+
+# Query params that identify the caller rather than the query
+_CREDENTIAL_PARAMS = {"app_id", "app_key"}
+
+adzuna_cache = AsyncTTLCache(ttl=ADZUNA_CACHE_TTL, max_entries=ADZUNA_CACHE_MAX_ENTRIES)
+
+# App-lifetime session, opened and closed by the FastAPI lifespan in app.main
+_session: Optional[aiohttp.ClientSession] = None
+
+def _create_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=ADZUNA_POOL_LIMIT,
+        limit_per_host=ADZUNA_POOL_LIMIT_PER_HOST,
+        use_dns_cache=True,
+        ttl_dns_cache=ADZUNA_DNS_TTL,
+        keepalive_timeout=ADZUNA_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        base_url=ADZUNA_BASE_URL + "/",
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=ADZUNA_TIMEOUT),
+        headers={"Accept": "application/json"},
+    )
+
+async def start_adzuna_client() -> None:
+    """Open the pooled Adzuna session (called once at app startup)"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+
+async def close_adzuna_client() -> None:
+    """Close the pooled Adzuna session (called once at app shutdown)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def get_adzuna_session() -> aiohttp.ClientSession:
+    """Get the shared Adzuna session, creating it if the lifespan has not run"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+def _normalize_param(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+def adzuna_cache_key(path: str, params: Dict[str, Any]) -> Tuple:
+    """Cache key from the endpoint and normalized query params (credentials excluded)"""
+    normalized = sorted(
+        (key, _normalize_param(value))
+        for key, value in params.items()
+        if key not in _CREDENTIAL_PARAMS and value is not None
+    )
+    return (path.strip("/"), tuple(normalized))
+
+async def _fetch(path: str, params: Dict[str, Any], timeout: Optional[float]) -> Tuple[int, Optional[Dict[str, Any]]]:
+    session = get_adzuna_session()
+    request_timeout = aiohttp.ClientTimeout(total=timeout) if timeout else None
+    # aiohttp rejects None values in query params
+    clean_params = {key: value for key, value in params.items() if value is not None}
+
+    async with session.get(path.lstrip("/"), params=clean_params, timeout=request_timeout) as response:
+        if response.status != 200:
+            return response.status, None
+        return response.status, await response.json(content_type=None)
+
+async def adzuna_get(path: str, params: Dict[str, Any], timeout: Optional[float] = None, use_cache: bool = True) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """GET an Adzuna endpoint over the shared pool.
+
+    `path` is relative to the API root, e.g. "jobs/us/search/1". Returns the HTTP
+    status and the decoded JSON body (None when the status is not 200).
+
+    Successful responses are cached by adzuna_cache_key for ADZUNA_CACHE_TTL
+    seconds, and concurrent identical misses share one upstream call. The returned
+    body may be shared with other requests, so do not mutate it.
+    """
+    if not use_cache:
+        return await _fetch(path, params, timeout)
+
+    return await adzuna_cache.get_or_fetch(
+        adzuna_cache_key(path, params),
+        lambda: _fetch(path, params, timeout),
+        should_cache=lambda result: result[0] == 200,
+    )
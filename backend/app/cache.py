@@ -0,0 +1,93 @@
+"""In-process async response cache shared by upstream API clients"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+class AsyncTTLCache:
+    """Size-bounded LRU cache with per-entry TTL that coalesces concurrent misses.
+
+    N callers missing on the same key at once share one upstream fetch.
+    Cached values are shared between callers, so treat them as read-only.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for `key`, fetching it once on a miss.
+
+        `should_cache` can reject results (e.g. upstream errors) so they are
+        returned to the waiting callers but not stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+
+            async def run():
+                try:
+                    result = await fetch()
+                    if should_cache is None or should_cache(result):
+                        self.set(key, result, ttl)
+                    return result
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.create_task(run())
+            self._inflight[key] = task
+        else:
+            self.hits += 1
+
+        # Shield so one caller disconnecting does not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
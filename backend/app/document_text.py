@@ -0,0 +1,92 @@
+"""Resume text extraction (PDF, DOCX, TXT) off the event loop.
+
+Parsing is CPU-bound, so it runs in a process pool sized to the cores and
+works on in-memory buffers: no temp files are written.
+"""
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from typing import Iterable, List, Optional
+
+import PyPDF2
+from docx import Document
+
+DOCUMENT_EXTRACTION_WORKERS = int(os.getenv("DOCUMENT_EXTRACTION_WORKERS", str(os.cpu_count() or 1)))
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc', '.txt')
+UNSUPPORTED_FORMAT_MESSAGE = "Unsupported file format. Please upload PDF, DOCX, or TXT files."
+
+class UnsupportedDocumentError(ValueError):
+    pass
+
+def _join_within_budget(parts: Iterable[str], max_chars: Optional[int]) -> str:
+    """Join text parts, consuming (and so parsing) only as many as fit in `max_chars`"""
+    collected: List[str] = []
+    total = 0
+    for part in parts:
+        collected.append(part)
+        total += len(part) + 1
+        if max_chars is not None and total >= max_chars:
+            break
+    text = "\n".join(collected).strip()
+    return text[:max_chars] if max_chars is not None else text
+
+def extract_document_text(content: bytes, filename: str, max_chars: Optional[int] = None) -> str:
+    """Extract text from the raw bytes of a PDF, DOCX or TXT file (runs in a pool process).
+
+    Pages and paragraphs are extracted one at a time and extraction stops once
+    `max_chars` characters have been collected, so later pages of a long
+    document are never parsed.
+    """
+    if filename.endswith('.pdf'):
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+        # PdfReader parses a page only when it is accessed
+        return _join_within_budget((page.extract_text() or "" for page in pdf_reader.pages), max_chars)
+
+    elif filename.endswith(('.docx', '.doc')):
+        doc = Document(io.BytesIO(content))
+        return _join_within_budget((paragraph.text for paragraph in doc.paragraphs), max_chars)
+
+    elif filename.endswith('.txt'):
+        text = content.decode('utf-8').strip()
+        return text[:max_chars] if max_chars is not None else text
+
+    raise UnsupportedDocumentError(UNSUPPORTED_FORMAT_MESSAGE)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: never fork the server process with its running threads and sockets
+        _pool = ProcessPoolExecutor(
+            max_workers=DOCUMENT_EXTRACTION_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+async def extract_text(content: bytes, filename: str, max_chars: Optional[int] = None) -> str:
+    """Extract text in the process pool without blocking the event loop"""
+    global _pool
+    if not filename.endswith(SUPPORTED_EXTENSIONS):
+        raise UnsupportedDocumentError(UNSUPPORTED_FORMAT_MESSAGE)
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        return await loop.run_in_executor(pool, extract_document_text, content, filename, max_chars)
+    except BrokenProcessPool:
+        # A worker died (e.g. a pathological PDF); replace the pool once and retry
+        if _pool is pool:
+            print("Document extraction pool broke - restarting it")
+            pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        return await loop.run_in_executor(_get_pool(), extract_document_text, content, filename, max_chars)
+
+def close_document_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,252 @@
+"""Background Adzuna ingestion that keeps the local job index warm.
+
+Each sweep walks every Adzuna category plus a list of popular queries, newest
+postings first, under a requests-per-minute budget. Progress is checkpointed
+after every page so a restart resumes mid-sweep, and each target only pulls
+postings newer than the newest one seen on its previous sweep.
+"""
+import asyncio
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from app.adzuna_client import adzuna_get
+from app.job_index import process_job, upsert_jobs
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-worker lock, every worker may ingest
+    fcntl = None
+
+load_dotenv()
+
+ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
+ADZUNA_API_KEY = os.getenv("ADZUNA_API_KEY")
+
+# Ingestion configuration
+INGESTION_ENABLED = os.getenv("INGESTION_ENABLED", "false").lower() == "true"
+INGESTION_REQUESTS_PER_MINUTE = float(os.getenv("INGESTION_REQUESTS_PER_MINUTE", "10"))
+INGESTION_MAX_PAGES = int(os.getenv("INGESTION_MAX_PAGES", "5"))
+INGESTION_INTERVAL = float(os.getenv("INGESTION_INTERVAL", str(60 * 60)))
+INGESTION_RESULTS_PER_PAGE = 50
+INGESTION_POPULAR_QUERIES = [
+    query.strip()
+    for query in os.getenv(
+        "INGESTION_POPULAR_QUERIES",
+        "software engineer,data scientist,product manager,marketing manager,designer,nurse,sales,remote"
+    ).split(",")
+    if query.strip()
+]
+INGESTION_STATE_PATH = os.getenv("INGESTION_STATE_PATH", "cache/ingestion_state.json")
+INGESTION_LOCK_PATH = INGESTION_STATE_PATH + ".lock"
+
+class RateLimiter:
+    """Spaces calls evenly so they never exceed `per_minute`"""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+class QuotaExhausted(Exception):
+    pass
+
+def _empty_state() -> Dict[str, Any]:
+    return {
+        "sweep_targets": None,  # Targets of the sweep in progress, None between sweeps
+        "target_index": 0,
+        "page": 1,
+        "pending_newest": None,  # Newest `created` seen so far on the current target
+        "targets": {},  # target key -> {"newest_created", "last_swept_at"}
+        "last_sweep_completed_at": None,
+    }
+
+def load_state() -> Dict[str, Any]:
+    try:
+        with open(INGESTION_STATE_PATH) as f:
+            return {**_empty_state(), **json.load(f)}
+    except (OSError, ValueError):
+        return _empty_state()
+
+def save_state(state: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically so a crash never leaves a torn file"""
+    directory = os.path.dirname(INGESTION_STATE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = INGESTION_STATE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, INGESTION_STATE_PATH)
+
+def days_since(created: str) -> int:
+    """Whole days between an Adzuna `created` timestamp and now, rounded up"""
+    try:
+        then = datetime.fromisoformat(created.replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    return max(1, math.ceil((datetime.now(timezone.utc) - then).total_seconds() / 86400))
+
+class IngestionWorker:
+    def __init__(self):
+        self.limiter = RateLimiter(INGESTION_REQUESTS_PER_MINUTE)
+        self.state = load_state()
+        self.last_error: Optional[str] = None
+        self.jobs_ingested = 0
+
+    def _base_params(self) -> Dict[str, Any]:
+        return {"app_id": ADZUNA_APP_ID, "app_key": ADZUNA_API_KEY, "content-type": "application/json"}
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        await self.limiter.acquire()
+        status, data = await adzuna_get(path, params, use_cache=False)
+        if status == 429:
+            raise QuotaExhausted("Adzuna rate limit reached")
+        if status != 200:
+            raise RuntimeError(f"Adzuna API error: {status}")
+        return data
+
+    async def load_targets(self) -> List[Dict[str, str]]:
+        """Every category tag plus the popular queries, in a stable order"""
+        data = await self._get("categories", self._base_params())
+        targets = [
+            {"key": f"category:{cat['tag']}", "category": cat["tag"]}
+            for cat in data.get("results", [])
+            if cat.get("tag")
+        ]
+        targets.extend({"key": f"query:{query.lower()}", "what": query} for query in INGESTION_POPULAR_QUERIES)
+        return targets
+
+    async def ingest_target(self, target: Dict[str, str]) -> None:
+        """Page through one target newest-first until it reaches already-ingested postings"""
+        checkpoint = self.state["targets"].get(target["key"], {})
+        since = checkpoint.get("newest_created")
+
+        while self.state["page"] <= INGESTION_MAX_PAGES:
+            page = self.state["page"]
+            params = {**self._base_params(), "results_per_page": INGESTION_RESULTS_PER_PAGE, "sort_by": "date"}
+            if "category" in target:
+                params["category"] = target["category"]
+            else:
+                params["what"] = target["what"]
+            if since:
+                params["max_days_old"] = days_since(since)
+
+            data = await self._get(f"jobs/us/search/{page}", params)
+            results = data.get("results", [])
+            fresh = [job for job in results if not since or job.get("created", "") > since]
+            self.jobs_ingested += await upsert_jobs([process_job(job) for job in fresh])
+
+            newest = max((job.get("created", "") for job in results), default="")
+            if newest and newest > (self.state["pending_newest"] or ""):
+                self.state["pending_newest"] = newest
+            self.state["page"] = page + 1
+            save_state(self.state)
+
+            # Older postings were ingested by an earlier sweep, or there are no more pages
+            if len(fresh) < len(results) or len(results) < INGESTION_RESULTS_PER_PAGE:
+                break
+
+        newest_created = max(filter(None, [since, self.state["pending_newest"]]), default=None)
+        self.state["targets"][target["key"]] = {"newest_created": newest_created, "last_swept_at": time.time()}
+
+    async def run_sweep(self) -> None:
+        """Run (or resume) one sweep over every target"""
+        if self.state["sweep_targets"] is None:
+            self.state.update(sweep_targets=await self.load_targets(), target_index=0, page=1, pending_newest=None)
+            save_state(self.state)
+            print(f"Ingestion sweep started over {len(self.state['sweep_targets'])} targets")
+        else:
+            print(f"Resuming ingestion sweep at target {self.state['target_index']}, page {self.state['page']}")
+
+        targets = self.state["sweep_targets"]
+        while self.state["target_index"] < len(targets):
+            await self.ingest_target(targets[self.state["target_index"]])
+            self.state.update(target_index=self.state["target_index"] + 1, page=1, pending_newest=None)
+            save_state(self.state)
+
+        self.state.update(sweep_targets=None, target_index=0, page=1, last_sweep_completed_at=time.time())
+        save_state(self.state)
+        print(f"Ingestion sweep finished ({self.jobs_ingested} jobs ingested since startup)")
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.run_sweep()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Checkpoint is already saved; the next sweep resumes from it
+                print(f"Ingestion sweep stopped: {e}")
+                self.last_error = str(e)
+            await asyncio.sleep(INGESTION_INTERVAL)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": True,
+            "sweep_in_progress": self.state["sweep_targets"] is not None,
+            "target_index": self.state["target_index"],
+            "targets_tracked": len(self.state["targets"]),
+            "last_sweep_completed_at": self.state["last_sweep_completed_at"],
+            "jobs_ingested": self.jobs_ingested,
+            "last_error": self.last_error,
+        }
+
+_worker: Optional[IngestionWorker] = None
+_task: Optional[asyncio.Task] = None
+_lock_file = None
+
+def _acquire_worker_lock() -> bool:
+    """Only one uvicorn worker per host runs ingestion"""
+    global _lock_file
+    if fcntl is None:
+        return True
+    directory = os.path.dirname(INGESTION_LOCK_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _lock_file = open(INGESTION_LOCK_PATH, "w")
+    try:
+        fcntl.flock(_lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        _lock_file.close()
+        _lock_file = None
+        return False
+
+def start_ingestion() -> None:
+    """Start the ingestion loop if enabled and configured (called at app startup)"""
+    global _worker, _task
+    if not INGESTION_ENABLED or not ADZUNA_APP_ID or not ADZUNA_API_KEY or _task is not None:
+        return
+    if not _acquire_worker_lock():
+        print("Ingestion already running in another worker")
+        return
+    _worker = IngestionWorker()
+    _task = asyncio.create_task(_worker.run_forever())
+
+async def stop_ingestion() -> None:
+    global _task, _lock_file
+    if _task is not None:
+        _task.cancel()
+        await asyncio.gather(_task, return_exceptions=True)
+        _task = None
+    if _lock_file is not None:
+        _lock_file.close()
+        _lock_file = None
+
+def ingestion_status() -> Dict[str, Any]:
+    if _worker is None:
+        return {"enabled": False}
+    return _worker.status()
@@ -0,0 +1,100 @@
+"""Single-pass intent and career-term detection for chat messages"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Conversational responses that don't need career analysis
+CONVERSATIONAL_PATTERNS = [
+    "thanks", "thank you", "hi", "hello", "hey", "goodbye", "bye",
+    "how are you", "what's up", "nice", "cool", "awesome", "great",
+    "ok", "okay", "sure", "yes", "no", "maybe", "haha", "lol",
+    "i didn't know that", "oh interesting", "that's helpful",
+    "good to know", "makes sense", "i see", "got it",
+    "is that for later", "when will that be", "what about",
+    "sounds good", "perfect", "exactly", "right", "true"
+]
+
+# Career/job terms used to look up market data
+CAREER_KEYWORDS = [
+    'engineer', 'developer', 'data scientist', 'analyst', 'manager', 'designer',
+    'marketing', 'sales', 'finance', 'accounting', 'nurse', 'teacher', 'lawyer',
+    'doctor', 'researcher', 'consultant', 'product', 'operations', 'hr',
+    'human resources', 'software', 'web', 'mobile', 'frontend', 'backend',
+    'full stack', 'devops', 'cloud', 'ai', 'machine learning', 'cyber',
+    'security', 'project', 'business', 'strategy', 'content', 'writer',
+    'journalist', 'editor', 'photographer', 'artist', 'musician', 'actor',
+    'astronaut', 'pilot', 'mechanic', 'electrician', 'plumber', 'chef',
+    'architect', 'scientist'
+]
+
+class PatternMatcher:
+    """Finds phrases from several labelled vocabularies in one pass over a text.
+
+    All phrases are compiled into a single regex, longest first, that only
+    matches at word starts, so "no" does not fire inside "know". Phrases of
+    labels listed in `suffix_labels` may be followed by any word ending
+    ("engineering", "cybersecurity", "nurses"); phrases shorter than
+    SUFFIX_MIN_LENGTH only take a plural "s", so "ai" stays out of "aim".
+    """
+
+    SUFFIX_MIN_LENGTH = 3
+
+    def __init__(self, vocabularies: Dict[str, Iterable[str]], suffix_labels: Iterable[str] = ()):
+        self.labels = list(vocabularies)
+        suffix_labels = set(suffix_labels)
+        # Surface form -> (label, canonical phrase) pairs it stands for
+        self._forms: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        # Forms that may carry a word ending
+        self._stems: Set[str] = set()
+        # Position of each phrase in its vocabulary, i.e. its priority
+        self._rank: Dict[Tuple[str, str], int] = {}
+        for label, phrases in vocabularies.items():
+            for position, phrase in enumerate(phrases):
+                self._rank.setdefault((label, phrase), position)
+                if label in suffix_labels and len(phrase) >= self.SUFFIX_MIN_LENGTH:
+                    forms = [phrase]
+                    self._stems.add(phrase)
+                elif label in suffix_labels:
+                    forms = [phrase, phrase + "s"]
+                else:
+                    forms = [phrase]
+                for form in forms:
+                    if (label, phrase) not in self._forms[form]:
+                        self._forms[form].append((label, phrase))
+
+        alternation = "|".join(
+            re.escape(form) + (r"\w*" if form in self._stems else "")
+            for form in sorted(self._forms, key=len, reverse=True)
+        )
+        self._regex = re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+    def _pairs(self, matched: str) -> List[Tuple[str, str]]:
+        if matched in self._forms:
+            return self._forms[matched]
+        # A stem followed by a word ending: find the longest stem it starts with
+        for end in range(len(matched) - 1, 0, -1):
+            if matched[:end] in self._stems:
+                return self._forms[matched[:end]]
+        return []
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Matched phrases per label, in vocabulary (priority) order"""
+        found: Dict[str, List[str]] = {label: [] for label in self.labels}
+        normalized = text.lower().replace("’", "'")
+        for match in self._regex.finditer(normalized):
+            for label, phrase in self._pairs(match.group()):
+                if phrase not in found[label]:
+                    found[label].append(phrase)
+        for label, phrases in found.items():
+            phrases.sort(key=lambda phrase: self._rank[(label, phrase)])
+        return found
+
+# Built once at import
+message_matcher = PatternMatcher(
+    {"conversational": CONVERSATIONAL_PATTERNS, "career_term": CAREER_KEYWORDS},
+    suffix_labels=["career_term"]
+)
+
+def match_message(message: str) -> Dict[str, List[str]]:
+    """Every conversational pattern and career term in a message"""
+    return message_matcher.match(message)
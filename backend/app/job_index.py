@@ -0,0 +1,195 @@
+"""Local persistent job store with an SQLite FTS5 (BM25) index.
+
+Every Adzuna posting that passes through the app is upserted here, so repeat
+searches can be answered locally and search keeps working when Adzuna throttles.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+JOB_INDEX_PATH = os.getenv("JOB_INDEX_PATH", "cache/job_index.sqlite3")
+# Postings older than this are ignored by local search
+JOB_INDEX_MAX_AGE = float(os.getenv("JOB_INDEX_MAX_AGE", str(7 * 24 * 60 * 60)))
+# A local query with fewer hits than this is treated as cold
+JOB_INDEX_MIN_RESULTS = int(os.getenv("JOB_INDEX_MIN_RESULTS", "20"))
+
+# BM25 column weights: title, company, location, description
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT UNIQUE NOT NULL,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    type TEXT,
+    description TEXT,
+    url TEXT,
+    salary_min REAL,
+    salary_max REAL,
+    posted_at TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_indexed_at ON jobs (indexed_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, location, description,
+    content='jobs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (new.rowid, new.title, new.company, new.location, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.rowid, old.title, old.company, old.location, old.description);
+    INSERT INTO jobs_fts (rowid, title, company, location, description)
+    VALUES (new.rowid, new.title, new.company, new.location, new.description);
+END;
+"""
+
+_JOB_COLUMNS = ("id", "title", "company", "location", "type", "description", "url", "salary_min", "salary_max", "posted_at")
+
+_initialized = False
+# Keeps fire-and-forget indexing tasks alive until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+def process_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a raw Adzuna posting to the job shape the frontend uses"""
+    return {
+        "id": str(job.get("id", "")),
+        "title": job.get("title", ""),
+        "company": job.get("company", {}).get("display_name", ""),
+        "location": job.get("location", {}).get("display_name", ""),
+        "type": job.get("contract_type", ""),
+        "description": job.get("description", ""),
+        "url": job.get("redirect_url", ""),
+        "salary_min": job.get("salary_min"),
+        "salary_max": job.get("salary_max"),
+        "posted_at": job.get("created", "")
+    }
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    directory = os.path.dirname(JOB_INDEX_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(JOB_INDEX_PATH, timeout=10)
+    if not _initialized:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(_SCHEMA)
+        _initialized = True
+    return connection
+
+def _upsert(jobs: List[Dict[str, Any]]) -> int:
+    now = time.time()
+    rows = [
+        tuple(job.get(column) for column in _JOB_COLUMNS) + (now,)
+        for job in jobs
+        if job.get("id")
+    ]
+    if not rows:
+        return 0
+
+    updates = ", ".join(f"{column} = excluded.{column}" for column in _JOB_COLUMNS[1:])
+    with closing(_connect()) as connection, connection:
+        connection.executemany(
+            f"INSERT INTO jobs ({', '.join(_JOB_COLUMNS)}, indexed_at) "
+            f"VALUES ({', '.join('?' for _ in _JOB_COLUMNS)}, ?) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}, indexed_at = excluded.indexed_at",
+            rows,
+        )
+    return len(rows)
+
+def fts_query(text: str, column: Optional[str] = None) -> str:
+    """Turn free text into an FTS5 query: every term must match (prefix match)"""
+    terms = re.findall(r"\w+", text.lower())
+    prefix = f"{column} : " if column else ""
+    return " ".join(f'{prefix}"{term}"*' for term in terms)
+
+def _search(query: str, location: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    match = fts_query(query)
+    if location:
+        match = f"{match} {fts_query(location, column='location')}".strip()
+    if not match:
+        return []
+
+    with closing(_connect()) as connection:
+        rows = connection.execute(
+            f"SELECT {', '.join('jobs.' + column for column in _JOB_COLUMNS)} "
+            "FROM jobs_fts JOIN jobs ON jobs.rowid = jobs_fts.rowid "
+            "WHERE jobs_fts MATCH ? AND jobs.indexed_at >= ? "
+            "ORDER BY bm25(jobs_fts, ?, ?, ?, ?) LIMIT ?",
+            (match, time.time() - JOB_INDEX_MAX_AGE, *BM25_WEIGHTS, limit),
+        ).fetchall()
+    return [dict(zip(_JOB_COLUMNS, row)) for row in rows]
+
+def _get_by_ids(job_ids: List[str]) -> List[Dict[str, Any]]:
+    placeholders = ", ".join("?" for _ in job_ids)
+    with closing(_connect()) as connection:
+        rows = connection.execute(
+            f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id IN ({placeholders})", job_ids
+        ).fetchall()
+    found = {row[0]: dict(zip(_JOB_COLUMNS, row)) for row in rows}
+    return [found[job_id] for job_id in job_ids if job_id in found]
+
+def _count() -> int:
+    with closing(_connect()) as connection:
+        return connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+async def upsert_jobs(jobs: List[Dict[str, Any]]) -> int:
+    """Upsert processed jobs (see process_job); SQLite I/O runs off the event loop"""
+    try:
+        return await asyncio.to_thread(_upsert, jobs)
+    except sqlite3.Error as e:
+        print(f"Job index write error: {e}")
+        return 0
+
+def index_jobs_in_background(jobs: List[Dict[str, Any]]) -> None:
+    """Schedule an upsert without delaying the current request"""
+    if not jobs:
+        return
+    task = asyncio.create_task(upsert_jobs(jobs))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def index_adzuna_results(results: List[Dict[str, Any]]) -> None:
+    """Schedule an upsert of raw Adzuna postings"""
+    index_jobs_in_background([process_job(job) for job in results])
+
+async def search_local_jobs(query: str, location: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """BM25-ranked search over fresh indexed postings"""
+    try:
+        return await asyncio.to_thread(_search, query, location, limit)
+    except sqlite3.Error as e:
+        print(f"Job index search error: {e}")
+        return []
+
+async def get_indexed_jobs(job_ids: List[str]) -> List[Dict[str, Any]]:
+    """Indexed postings with the given IDs, in the order asked for (unknown IDs are skipped)"""
+    if not job_ids:
+        return []
+    try:
+        return await asyncio.to_thread(_get_by_ids, list(dict.fromkeys(job_ids)))
+    except sqlite3.Error as e:
+        print(f"Job index read error: {e}")
+        return []
+
+async def job_index_size() -> int:
+    try:
+        return await asyncio.to_thread(_count)
+    except sqlite3.Error:
+        return 0
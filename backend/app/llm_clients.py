@@ -0,0 +1,74 @@
+"""App-wide registry of async OpenAI-compatible clients (OpenAI and Perplexity)"""
+import os
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+load_dotenv()
+
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+# Connection pool configuration (shared by every LLM client)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+
+# HTTP/2 multiplexes many concurrent completions over one connection; it needs the h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+LLM_HTTP2 = HTTP2_AVAILABLE and os.getenv("LLM_HTTP2", "true").lower() != "false"
+
+# Clients keyed by provider name, opened and closed by the FastAPI lifespan in app.main
+_clients: Dict[str, AsyncOpenAI] = {}
+
+def _create_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    http_client = DefaultAsyncHttpxClient(
+        http2=LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+def _get_client(name: str) -> Optional[AsyncOpenAI]:
+    if name in _clients:
+        return _clients[name]
+
+    if name == "openai":
+        api_key, base_url = os.getenv("OPENAI_API_KEY"), None
+    elif name == "perplexity":
+        api_key, base_url = os.getenv("PERPLEXITY_API_KEY"), PERPLEXITY_BASE_URL
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    if not api_key:
+        return None
+
+    _clients[name] = _create_client(api_key, base_url)
+    return _clients[name]
+
+def get_openai_client() -> Optional[AsyncOpenAI]:
+    """Get the shared async OpenAI client, or None if no API key is configured"""
+    return _get_client("openai")
+
+def get_perplexity_client() -> Optional[AsyncOpenAI]:
+    """Get the shared async Perplexity client, or None if no API key is configured"""
+    return _get_client("perplexity")
+
+async def start_llm_clients() -> None:
+    """Create the configured LLM clients (called once at app startup)"""
+    get_openai_client()
+    get_perplexity_client()
+
+async def close_llm_clients() -> None:
+    """Close every LLM client and its connection pool (called once at app shutdown)"""
+    for client in _clients.values():
+        await client.close()
+    _clients.clear()
@@ -1,17 +1,38 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import openai
 import os
 import asyncio
-import aiohttp
 import json
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from app.routers import jobs, analytics, ai_tools, help_me_apply
+from app.adzuna_client import adzuna_get, start_adzuna_client, close_adzuna_client
+from app.llm_clients import get_openai_client, get_perplexity_client, start_llm_clients, close_llm_clients
+from app.sse import sse_event, sse_response
+from app.perplexity_cache import cached_perplexity_search
+from app.job_index import index_adzuna_results
+from app.ingestion import start_ingestion, stop_ingestion
+from app.intents import match_message
+from app.document_text import close_document_pool
+from app.routers import jobs, analytics, ai_tools, help_me_apply, adzuna
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open shared upstream connection pools once per worker
+    await start_adzuna_client()
+    await start_llm_clients()
+    # Keep the local job index warm (no-op unless INGESTION_ENABLED=true)
+    start_ingestion()
+    yield
+    await stop_ingestion()
+    await adzuna.stop_adzuna_snapshots()
+    await close_llm_clients()
+    await close_adzuna_client()
+    close_document_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Include routers
 app.include_router(jobs.router, prefix="/api")
@@ -44,32 +65,40 @@ class AIToolsRequest(BaseModel):
 class AIToolsResponse(BaseModel):
     response: str
 
-# Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Initialize Perplexity client
-perplexity_client = openai.OpenAI(
-    api_key=os.getenv("PERPLEXITY_API_KEY"),
-    base_url="https://api.perplexity.ai"
-)
-
 @app.get("/")
 async def root():
     return {"message": "Pathio Backend - Intelligent Career Chat"}
 
+# Perplexity search options for chat web research
+PERPLEXITY_SEARCH_PARAMS = {
+    "search_mode": "web",
+    "search_recency_filter": "month",
+    "max_results": 10
+}
+
 async def fetch_perplexity_web_results(query: str) -> dict:
-    """Fetch real-time web search results from Perplexity"""
+    """Fetch real-time web search results from Perplexity (cached by recency)"""
+    return await cached_perplexity_search(
+        "chat",
+        query,
+        PERPLEXITY_SEARCH_PARAMS,
+        lambda: request_perplexity_web_results(query),
+        should_cache=lambda result: bool(result.get("content"))
+    )
+
+async def request_perplexity_web_results(query: str) -> dict:
+    """Query Perplexity for web research on the user's question"""
     try:
-        response = perplexity_client.chat.completions.create(
+        perplexity_client = get_perplexity_client()
+        if not perplexity_client:
+            return {"content": "", "search_results": []}
+        
+        response = await perplexity_client.chat.completions.create(
             model="sonar-pro",
             messages=[
                 {"role": "user", "content": query}
             ],
-            extra_body={
-                "search_mode": "web",
-                "search_recency_filter": "month",
-                "max_results": 10
-            },
+            extra_body=PERPLEXITY_SEARCH_PARAMS,
             max_tokens=800,
             temperature=0.1
         )
@@ -111,29 +140,27 @@ async def fetch_adzuna_market_data(query: str) -> dict:
         elif "marketing" in job_title:
             job_title = "marketing manager"
         
-        async with aiohttp.ClientSession() as session:
-            url = f"https://api.adzuna.com/v1/api/jobs/us/search/1"
-            params = {
-                "app_id": app_id,
-                "app_key": app_key,
-                "what": job_title,
-                "results_per_page": 10,
-                "content-type": "application/json"
+        params = {
+            "app_id": app_id,
+            "app_key": app_key,
+            "what": job_title,
+            "results_per_page": 10,
+            "content-type": "application/json"
+        }
+        
+        status, data = await adzuna_get("jobs/us/search/1", params)
+        if status == 200:
+            index_adzuna_results(data.get("results", []))
+            return {
+                "total_jobs": data.get("count", 0),
+                "jobs": data.get("results", [])[:5],  # Top 5 jobs
+                "salary_info": {
+                    "min": min([job.get("salary_min", 0) for job in data.get("results", []) if job.get("salary_min")]),
+                    "max": max([job.get("salary_max", 0) for job in data.get("results", []) if job.get("salary_max")])
+                } if data.get("results") else {}
             }
-            
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return {
-                        "total_jobs": data.get("count", 0),
-                        "jobs": data.get("results", [])[:5],  # Top 5 jobs
-                        "salary_info": {
-                            "min": min([job.get("salary_min", 0) for job in data.get("results", []) if job.get("salary_min")]),
-                            "max": max([job.get("salary_max", 0) for job in data.get("results", []) if job.get("salary_max")])
-                        } if data.get("results") else {}
-                    }
-                else:
-                    return {"error": f"Adzuna API error: {response.status}"}
+        else:
+            return {"error": f"Adzuna API error: {status}"}
     except Exception as e:
         print(f"Adzuna API error: {e}")
         return {"error": str(e)}
@@ -154,49 +181,28 @@ def synthesize_web_results(perplexity_data: dict, adzuna_data: dict) -> str:
     
     return "\n".join(insights)
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    try:
-        # Smart filter for non-career questions
-        message_lower = request.message.lower().strip()
-        
-        # Conversational responses that don't need career analysis
-        conversational_patterns = [
-            "thanks", "thank you", "hi", "hello", "hey", "goodbye", "bye",
-            "how are you", "what's up", "nice", "cool", "awesome", "great",
-            "ok", "okay", "sure", "yes", "no", "maybe", "haha", "lol",
-            "i didn't know that", "oh interesting", "that's helpful", 
-            "good to know", "makes sense", "i see", "got it",
-            "is that for later", "when will that be", "what about",
-            "sounds good", "perfect", "exactly", "right", "true"
-        ]
-        
-        # Check if message is primarily conversational
-        is_conversational = any(pattern in message_lower for pattern in conversational_patterns)
-        is_short_response = len(message_lower.split()) <= 5
-        has_question_mark = "?" in request.message
-        
-        # If it's conversational and either short OR doesn't have a question mark, treat as casual
-        if is_conversational and (is_short_response or not has_question_mark):
-            return ChatResponse(
-                reply="You're welcome! I'm here to help with your career questions. Feel free to ask me about job opportunities, salary insights, industry trends, or career advice anytime!",
-                market_data={},
-                sources=[],
-                web_results=[]
-            )
-        
-        # Run Perplexity and Adzuna in parallel
-        perplexity_task = asyncio.create_task(fetch_perplexity_web_results(request.message))
-        adzuna_task = asyncio.create_task(fetch_adzuna_market_data(request.message))
-        
-        # Wait for both to complete
-        perplexity_data, adzuna_data = await asyncio.gather(perplexity_task, adzuna_task)
-        
-        # Synthesize the data
-        synthesized_insights = synthesize_web_results(perplexity_data, adzuna_data)
-        
-        # Create comprehensive prompt for OpenAI
-        system_prompt = """You are an intelligent career coach providing Perplexity-style responses. Structure your answer with these exact sections:
+CASUAL_REPLY = "You're welcome! I'm here to help with your career questions. Feel free to ask me about job opportunities, salary insights, industry trends, or career advice anytime!"
+
+def is_casual_message(message: str) -> bool:
+    """Detect conversational messages that don't need career analysis"""
+    # Smart filter for non-career questions
+    message_lower = message.lower().strip()
+    
+    # Check if message is primarily conversational (see app.intents.CONVERSATIONAL_PATTERNS)
+    is_conversational = bool(match_message(message_lower)["conversational"])
+    is_short_response = len(message_lower.split()) <= 5
+    has_question_mark = "?" in message
+    
+    # If it's conversational and either short OR doesn't have a question mark, treat as casual
+    return is_conversational and (is_short_response or not has_question_mark)
+
+def build_chat_messages(message: str, perplexity_data: dict, adzuna_data: dict) -> list:
+    """Build the OpenAI messages for a career chat answer"""
+    # Synthesize the data
+    synthesized_insights = synthesize_web_results(perplexity_data, adzuna_data)
+    
+    # Create comprehensive prompt for OpenAI
+    system_prompt = """You are an intelligent career coach providing Perplexity-style responses. Structure your answer with these exact sections:
 
 **Summary** - Brief 2-3 sentence overview
 **Key Insights** - Bullet points with specific data and insights
@@ -206,7 +212,7 @@ async def chat(request: ChatRequest):
 
 Use bullet points (-) for all lists. Be concise but comprehensive. Include specific numbers, companies, and data when available."""
 
-        user_prompt = f"""User Question: {request.message}
+    user_prompt = f"""User Question: {message}
 
 Web Research Insights:
 {perplexity_data.get('content', 'No web research available')}
@@ -216,30 +222,56 @@ Market Data:
 
 Provide a structured response following the exact format specified in the system prompt."""
 
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def extract_sources(perplexity_data: dict) -> list:
+    """Extract sources from Perplexity search results"""
+    sources = []
+    for result in perplexity_data.get("search_results", []):
+        if result.get("url"):
+            sources.append({
+                "title": result.get("title", "Web Source"),
+                "url": result.get("url")
+            })
+    return sources
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    try:
+        if is_casual_message(request.message):
+            return ChatResponse(
+                reply=CASUAL_REPLY,
+                market_data={},
+                sources=[],
+                web_results=[]
+            )
+        
+        # Run Perplexity and Adzuna in parallel
+        perplexity_task = asyncio.create_task(fetch_perplexity_web_results(request.message))
+        adzuna_task = asyncio.create_task(fetch_adzuna_market_data(request.message))
+        
+        # Wait for both to complete
+        perplexity_data, adzuna_data = await asyncio.gather(perplexity_task, adzuna_task)
+        
         # Generate response with OpenAI
-        response = openai_client.chat.completions.create(
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        response = await openai_client.chat.completions.create(
             model="gpt-4-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=build_chat_messages(request.message, perplexity_data, adzuna_data),
             max_tokens=1000,
             temperature=0.7
         )
         
-        # Extract sources from Perplexity
-        sources = []
-        for result in perplexity_data.get("search_results", []):
-            if result.get("url"):
-                sources.append({
-                    "title": result.get("title", "Web Source"),
-                    "url": result.get("url")
-                })
-        
         return ChatResponse(
             reply=response.choices[0].message.content,
             market_data=adzuna_data,
-            sources=sources,
+            sources=extract_sources(perplexity_data),
             web_results=perplexity_data.get("search_results", [])
         )
     
@@ -251,11 +283,71 @@ Provide a structured response following the exact format specified in the system
             web_results=[]
         )
 
+async def stream_chat_events(message: str):
+    """Yield SSE events for a chat answer.
+
+    `market_data`, `sources` and `web_results` are sent as soon as their upstream
+    finishes, then the completion arrives as `token` events and ends with `done`.
+    """
+    try:
+        if is_casual_message(message):
+            yield sse_event("token", {"content": CASUAL_REPLY})
+            yield sse_event("done", {})
+            return
+        
+        # Run Perplexity and Adzuna in parallel, forwarding each one as it lands
+        perplexity_task = asyncio.create_task(fetch_perplexity_web_results(message))
+        adzuna_task = asyncio.create_task(fetch_adzuna_market_data(message))
+        pending = {perplexity_task, adzuna_task}
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if adzuna_task in done:
+                    yield sse_event("market_data", adzuna_task.result())
+                if perplexity_task in done:
+                    perplexity_data = perplexity_task.result()
+                    yield sse_event("sources", extract_sources(perplexity_data))
+                    yield sse_event("web_results", perplexity_data.get("search_results", []))
+        finally:
+            # Client disconnected mid-gather
+            for task in pending:
+                task.cancel()
+        
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        stream = await openai_client.chat.completions.create(
+            model="gpt-4-turbo",
+            messages=build_chat_messages(message, perplexity_task.result(), adzuna_task.result()),
+            max_tokens=1000,
+            temperature=0.7,
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield sse_event("token", {"content": chunk.choices[0].delta.content})
+        
+        yield sse_event("done", {})
+    
+    except Exception as e:
+        yield sse_event("error", {"message": f"Sorry, I encountered an error: {str(e)}"})
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream a chat answer as Server-Sent Events (see stream_chat_events)"""
+    return sse_response(stream_chat_events(request.message))
+
 @app.post("/api/ai-tools", response_model=AIToolsResponse)
 async def ai_tools(request: AIToolsRequest):
     try:
         # Direct OpenAI call for AI tools recommendations
-        response = openai_client.chat.completions.create(
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        response = await openai_client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {
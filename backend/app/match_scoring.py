@@ -0,0 +1,220 @@
+"""Deterministic resume/job match scoring without an LLM.
+
+Job-description terms are weighted by TF-IDF, using the sections of both
+documents as the corpus so terms found everywhere count little. The score
+blends how much of that weight the resume covers with how many of the job's
+known skills the resume mentions.
+
+rank_jobs scores one resume against many postings at once: TF-IDF cosine
+similarity over the batch, computed on sparse (job, term) arrays in NumPy.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.prompt_compaction import STOPWORDS, split_job_sections, strip_boilerplate
+from app.resume_store import parse_resume_sections
+
+# Skills recognized as such (multi-word skills are matched as phrases)
+SKILL_TERMS = [
+    "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "php", "scala", "kotlin",
+    "sql", "nosql", "postgresql", "mysql", "mongodb", "redis", "elasticsearch", "kafka", "spark", "hadoop", "airflow", "dbt",
+    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "terraform", "ansible", "linux", "ci/cd", "jenkins", "git",
+    "react", "angular", "vue", "node.js", "django", "flask", "fastapi", "rails", ".net", "graphql",
+    "html", "css", "figma", "photoshop", "illustrator", "ux",
+    "machine learning", "deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "scikit-learn", "pandas", "numpy",
+    "statistics", "data analysis", "data visualization", "tableau", "power bi", "looker",
+    "salesforce", "hubspot", "seo", "sem", "google analytics", "content marketing", "copywriting",
+    "project management", "product management", "agile", "scrum", "jira", "stakeholder management",
+    "leadership", "communication", "negotiation", "budgeting", "forecasting", "accounting", "financial modeling",
+    "customer service", "sales", "recruiting", "nursing", "patient care", "teaching", "curriculum development",
+]
+# Skills whose name is also an everyday word ("ready to go", "excel in", "the rest
+# of the team") only count in context: phrase -> the skills it names
+CONTEXT_SKILLS: Dict[str, Tuple[str, ...]] = {
+    "golang": ("golang",), "go programming": ("golang",), "go language": ("golang",), "go developer": ("golang",),
+    "rest api": ("rest apis",), "rest apis": ("rest apis",), "restful": ("rest apis",), "rest services": ("rest apis",),
+    "microsoft excel": ("excel",), "ms excel": ("excel",), "advanced excel": ("excel",), "excel spreadsheets": ("excel",),
+    "excel spreadsheet": ("excel",), "excel formulas": ("excel",),
+    "swift programming": ("swift",), "swift developer": ("swift",), "swiftui": ("swift",),
+    "spring boot": ("spring boot",), "spring framework": ("spring boot",), "spring mvc": ("spring boot",),
+    "sketch app": ("sketch",),
+    "rust programming": ("rust",), "rust language": ("rust",), "rust developer": ("rust",),
+    "ui design": ("ui design",), "ui designer": ("ui design",), "ui development": ("ui design",),
+    "user interface design": ("ui design",), "ui/ux": ("ui design", "ux"), "ux/ui": ("ux", "ui design"),
+}
+# In a list of skills (a resume's skills section, a stored extraction) the bare words are unambiguous
+LIST_SKILLS: Dict[str, Tuple[str, ...]] = {
+    "go": ("golang",), "rest": ("rest apis",), "excel": ("excel",), "swift": ("swift",),
+    "spring": ("spring boot",), "sketch": ("sketch",), "rust": ("rust",), "ui": ("ui design",),
+}
+
+def _skill_pattern(phrases: List[str]) -> "re.Pattern[str]":
+    alternation = "|".join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+    return re.compile(r"(?<![\w+#.])(?:" + alternation + r")(?![\w+#])")
+
+_SKILL_NAMES: Dict[str, Tuple[str, ...]] = {**{skill: (skill,) for skill in SKILL_TERMS}, **CONTEXT_SKILLS}
+_SKILL_PATTERN = _skill_pattern(list(_SKILL_NAMES))
+_LIST_SKILL_PATTERN = _skill_pattern(list(_SKILL_NAMES) + list(LIST_SKILLS))
+_TERM_PATTERN = re.compile(r"[a-z][a-z0-9+#]*")
+
+# Weight of keyword coverage vs skill coverage in the score
+KEYWORD_WEIGHT = 0.6
+SKILL_WEIGHT = 0.4
+
+def extract_skills(text: str, skill_list: bool = False) -> List[str]:
+    """Known skills mentioned in a text, in order of first mention.
+
+    With `skill_list` the text is a list of skills, so the bare LIST_SKILLS words count too.
+    """
+    pattern = _LIST_SKILL_PATTERN if skill_list else _SKILL_PATTERN
+    skills = {**_SKILL_NAMES, **LIST_SKILLS} if skill_list else _SKILL_NAMES
+    return list(dict.fromkeys(skill for phrase in pattern.findall(text.lower()) for skill in skills[phrase]))
+
+def term_counts(text: str) -> Counter:
+    """Term frequencies, without stopwords and very short terms"""
+    return Counter(term for term in _TERM_PATTERN.findall(text.lower()) if term not in STOPWORDS and len(term) > 2)
+
+def score_resume_match(
+    resume: str,
+    job_description: str,
+    resume_sections: Optional[Dict[str, str]] = None,
+    resume_skills: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Match score (0-100) with the job's matched and missing keywords and skills.
+
+    `resume_sections` and `resume_skills` come from the resume store when the
+    resume has been stored (and analyzed); extracted skills count alongside the
+    ones found in the text.
+    """
+    job_sections = [text for _, text in strip_boilerplate(split_job_sections(job_description))] or [job_description]
+    job_text = "\n".join(job_sections)
+    resume_sections = resume_sections or parse_resume_sections(resume)
+    corpus = job_sections + list(resume_sections.values())
+    document_frequency: Counter = Counter()
+    for section in corpus:
+        document_frequency.update(set(term_counts(section)))
+
+    resume_terms = term_counts(resume)
+    job_terms = term_counts(job_text)
+    weights = {
+        term: (1 + math.log(count)) * math.log(1 + len(corpus) / document_frequency[term])
+        for term, count in job_terms.items()
+    }
+    total_weight = sum(weights.values())
+    covered_weight = sum(weight for term, weight in weights.items() if term in resume_terms)
+    keyword_coverage = covered_weight / total_weight if total_weight else 0.0
+
+    job_skills = extract_skills(job_text)
+    known_skills = (
+        set(extract_skills(resume))
+        | set(extract_skills(resume_sections.get("skills", ""), skill_list=True))
+        | set(extract_skills(", ".join(resume_skills or []), skill_list=True))
+    )
+    matched_skills = [skill for skill in job_skills if skill in known_skills]
+    missing_skills = [skill for skill in job_skills if skill not in known_skills]
+    skill_coverage = len(matched_skills) / len(job_skills) if job_skills else keyword_coverage
+
+    ranked_terms = sorted(weights, key=lambda term: (-weights[term], term))
+    score = 100 * (KEYWORD_WEIGHT * keyword_coverage + SKILL_WEIGHT * skill_coverage)
+    return {
+        "match_score": max(0, min(100, round(score))),
+        "matched_skills": matched_skills,
+        "missing_skills": missing_skills,
+        "matched_keywords": [term for term in ranked_terms if term in resume_terms][:10],
+        "missing_keywords": [term for term in ranked_terms if term not in resume_terms][:10],
+    }
+
+def local_feedback(match: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Template improvements and daily tasks built from the missing skills and keywords"""
+    missing = match["missing_skills"] or match["missing_keywords"]
+    keywords = ", ".join(f"'{term}'" for term in match["missing_keywords"][:3])
+    improvements = [
+        f"Include keywords from the job posting like {keywords}" if keywords else "Mirror the job posting's wording in your resume",
+        f"Add specific examples of your experience with {missing[0]}" if missing else "Add measurable results to your most relevant roles",
+        f"Highlight your {', '.join(match['matched_skills'][:2])} experience near the top" if match["matched_skills"] else "Lead with the experience most relevant to this role",
+    ]
+    daily_tasks = [
+        f"Take a free online course on {skill} (Coursera, edX, or YouTube)" for skill in match["missing_skills"][:2]
+    ]
+    daily_tasks += [
+        "Practice the required skills with a hands-on project or tutorial",
+        "Read industry articles and stay updated on trends",
+    ][:3 - len(daily_tasks)]
+    return {"improvements": improvements, "daily_tasks": daily_tasks}
+
+def rank_jobs(resume: str, jobs: List[Dict[str, Any]], top_k: int = 10, max_terms: int = 10) -> List[Dict[str, Any]]:
+    """The `top_k` jobs most similar to the resume, each with `similarity` and `matched_terms`.
+
+    IDF comes from the postings being ranked. Every (job, term) pair is one entry
+    in flat arrays, so weights, norms and dot products are each a single
+    vectorized pass however many jobs there are.
+    """
+    if not jobs:
+        return []
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    counts: List[int] = []
+    for row, job in enumerate(jobs):
+        # The title counts twice: it says more about the role than any description line
+        for term, count in term_counts(f"{job.get('title', '')}\n{job.get('title', '')}\n{job.get('description', '')}").items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+
+    resume_terms = term_counts(resume)
+    if not resume_terms or not vocabulary:
+        return []
+    row_array = np.asarray(rows, dtype=np.int64)
+    column_array = np.asarray(columns, dtype=np.int64)
+    document_frequency = np.bincount(column_array, minlength=len(vocabulary))
+    idf = np.log((1 + len(jobs)) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(np.asarray(counts, dtype=np.float64))) * idf[column_array]
+    job_norms = np.sqrt(np.bincount(row_array, weights=weights ** 2, minlength=len(jobs)))
+
+    # Resume terms no posting uses only add to the resume's norm
+    unseen_idf = math.log(1 + len(jobs)) + 1
+    resume_weights = np.zeros(len(vocabulary))
+    resume_norm_squared = 0.0
+    for term, count in resume_terms.items():
+        column = vocabulary.get(term)
+        weight = (1 + math.log(count)) * (idf[column] if column is not None else unseen_idf)
+        if column is not None:
+            resume_weights[column] = weight
+        resume_norm_squared += weight ** 2
+
+    contributions = weights * resume_weights[column_array]
+    dots = np.bincount(row_array, weights=contributions, minlength=len(jobs))
+    similarity = dots / (np.maximum(job_norms, 1e-12) * math.sqrt(resume_norm_squared))
+
+    top_k = min(top_k, len(jobs))
+    top = np.argpartition(-similarity, top_k - 1)[:top_k]
+    top = top[np.argsort(-similarity[top], kind="stable")]
+
+    # Entries were appended job by job, so row_array is sorted: each top job's
+    # entries are one slice, gathered for all of them at once
+    starts = np.searchsorted(row_array, top, side="left")
+    lengths = np.searchsorted(row_array, top, side="right") - starts
+    groups = np.repeat(np.arange(len(top)), lengths)
+    entries = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    shared = contributions[entries] > 0
+    entries, groups = entries[shared], groups[shared]
+    # By top position, then largest contribution first
+    order = np.lexsort((-contributions[entries], groups))
+    entries, groups = entries[order], groups[order]
+    bounds = np.searchsorted(groups, np.arange(len(top) + 1))
+
+    terms_by_column = list(vocabulary)
+    ranked = []
+    for position, row in enumerate(top):
+        columns_matched = column_array[entries[bounds[position]:bounds[position + 1]][:max_terms]]
+        ranked.append({
+            **jobs[row],
+            "similarity": round(float(similarity[row]), 4),
+            "matched_terms": [terms_by_column[column] for column in columns_matched],
+        })
+    return ranked
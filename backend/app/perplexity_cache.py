@@ -0,0 +1,55 @@
+"""Recency-aware cache for Perplexity web research results"""
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from app.cache import AsyncTTLCache
+
+load_dotenv()
+
+# How long a cached answer stays valid for each search_recency_filter: the wider
+# the recency window, the slower the underlying results change.
+PERPLEXITY_RECENCY_TTLS = {
+    "hour": 5 * 60,
+    "day": 30 * 60,
+    "week": 2 * 60 * 60,
+    "month": float(os.getenv("PERPLEXITY_CACHE_TTL_MONTH", str(6 * 60 * 60))),
+    "6months": float(os.getenv("PERPLEXITY_CACHE_TTL_6MONTHS", str(24 * 60 * 60))),
+    "year": 24 * 60 * 60,
+}
+PERPLEXITY_CACHE_DEFAULT_TTL = float(os.getenv("PERPLEXITY_CACHE_DEFAULT_TTL", str(60 * 60)))
+PERPLEXITY_CACHE_MAX_ENTRIES = int(os.getenv("PERPLEXITY_CACHE_MAX_ENTRIES", "512"))
+
+perplexity_cache = AsyncTTLCache(ttl=PERPLEXITY_CACHE_DEFAULT_TTL, max_entries=PERPLEXITY_CACHE_MAX_ENTRIES)
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", prompt.lower()).strip().rstrip("?!. ")
+
+def recency_ttl(search_params: Dict[str, Any]) -> float:
+    return PERPLEXITY_RECENCY_TTLS.get(search_params.get("search_recency_filter"), PERPLEXITY_CACHE_DEFAULT_TTL)
+
+def perplexity_cache_key(namespace: str, prompt: str, search_params: Dict[str, Any]) -> Tuple:
+    """Cache key from the caller, the normalized prompt and the search parameters"""
+    return (namespace, normalize_prompt(prompt), tuple(sorted((key, str(value)) for key, value in search_params.items())))
+
+async def cached_perplexity_search(
+    namespace: str,
+    prompt: str,
+    search_params: Dict[str, Any],
+    fetch: Callable[[], Awaitable[Any]],
+    should_cache: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """Run a Perplexity lookup through the shared cache.
+
+    `namespace` separates callers that wrap the same prompt differently. The TTL
+    comes from the `search_recency_filter` in `search_params`, and concurrent
+    identical lookups share one upstream call.
+    """
+    return await perplexity_cache.get_or_fetch(
+        perplexity_cache_key(namespace, prompt, search_params),
+        fetch,
+        ttl=recency_ttl(search_params),
+        should_cache=should_cache,
+    )
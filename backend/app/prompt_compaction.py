@@ -0,0 +1,185 @@
+"""Local compaction of resume and job-description text before it goes into a prompt.
+
+Both documents are split into sections. Job-description boilerplate (EEO
+statements, benefits, company blurbs, application instructions) is dropped.
+The remaining sections are ranked by how many of the other document's terms
+they share and kept, most relevant first, within a token budget.
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.resume_store import parse_resume_sections
+
+# Token budgets per document (~4 characters per token)
+PROMPT_RESUME_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_TOKEN_BUDGET", "1500"))
+PROMPT_JOB_TOKEN_BUDGET = int(os.getenv("PROMPT_JOB_TOKEN_BUDGET", "1000"))
+# Resume budget when the stored extraction goes into the prompt alongside it
+PROMPT_RESUME_PROFILE_TOKEN_BUDGET = int(os.getenv("PROMPT_RESUME_PROFILE_TOKEN_BUDGET", "800"))
+CHARS_PER_TOKEN = 4
+
+# Job-description headings, mapped to a canonical section name
+JOB_SECTION_HEADINGS = {
+    "responsibilities": "responsibilities", "key responsibilities": "responsibilities", "what you'll do": "responsibilities",
+    "what you will do": "responsibilities", "the role": "responsibilities", "duties": "responsibilities", "your role": "responsibilities",
+    "requirements": "requirements", "qualifications": "requirements", "minimum qualifications": "requirements",
+    "basic qualifications": "requirements", "what you'll need": "requirements", "what you bring": "requirements",
+    "who you are": "requirements", "skills": "requirements", "required skills": "requirements",
+    "preferred qualifications": "preferred", "nice to have": "preferred", "bonus points": "preferred", "preferred skills": "preferred",
+    "compensation": "compensation", "salary": "compensation", "pay": "compensation",
+    "benefits": "benefits", "perks": "benefits", "what we offer": "benefits", "perks and benefits": "benefits",
+    "about us": "about", "why join us": "about", "about the company": "about", "who we are": "about", "our mission": "about",
+    "how to apply": "apply", "application process": "apply",
+    "equal opportunity": "eeo", "equal employment opportunity": "eeo", "eeo statement": "eeo", "diversity": "eeo",
+}
+BOILERPLATE_SECTIONS = {"benefits", "about", "apply", "eeo"}
+# Boilerplate a cover letter needs to show it understands the company
+COMPANY_SECTIONS = {"about"}
+# Sections the model always needs first when the budget is tight
+JOB_SECTION_PRIORITY = {"header": 3.0, "requirements": 2.0, "responsibilities": 2.0, "preferred": 1.0, "compensation": 0.5}
+
+BOILERPLATE_PATTERNS = re.compile(
+    r"equal opportunity employer|without regard to|reasonable accommodation|e-verify|"
+    r"protected veteran|sexual orientation|gender identity|national origin|"
+    r"privacy (?:notice|policy)|background check|drug[- ]free|pay transparency",
+    re.IGNORECASE
+)
+_HEADING_PATTERN = re.compile(r"^[\s#*\-•]*([A-Za-z][A-Za-z '&/]{1,40}?)\s*:?\s*$")
+_TERM_PATTERN = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it", "its",
+    "of", "on", "or", "our", "that", "the", "their", "this", "to", "we", "will", "with", "you", "your",
+    "able", "work", "team", "role", "experience", "years", "strong", "ability", "including", "etc",
+}
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def terms(text: str) -> Set[str]:
+    return {term for term in _TERM_PATTERN.findall(text.lower()) if term not in STOPWORDS and len(term) > 1}
+
+def split_job_sections(text: str) -> List[Tuple[str, str]]:
+    """(section name, text) pairs in document order; text before the first heading is "header" """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.splitlines():
+        match = _HEADING_PATTERN.match(line)
+        heading = JOB_SECTION_HEADINGS.get(match.group(1).strip().lower()) if match else None
+        if heading:
+            sections.append((heading, []))
+        else:
+            sections[-1][1].append(line)
+    return [(name, "\n".join(lines).strip()) for name, lines in sections if "\n".join(lines).strip()]
+
+def strip_boilerplate(sections: List[Tuple[str, str]], keep_sections: Iterable[str] = ()) -> List[Tuple[str, str]]:
+    """Drop boilerplate sections (except `keep_sections`), and boilerplate paragraphs inside the others"""
+    dropped = BOILERPLATE_SECTIONS - set(keep_sections)
+    kept = []
+    for name, text in sections:
+        if name in dropped:
+            continue
+        paragraphs = [p for p in re.split(r"\n\s*\n", text) if not BOILERPLATE_PATTERNS.search(p)]
+        text = "\n\n".join(paragraphs).strip()
+        if text:
+            kept.append((name, text))
+    return kept
+
+def render_section(name: str, text: str) -> str:
+    return text if name == "header" else f"{name.replace('_', ' ').title()}:\n{text}"
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep whole lines while they fit"""
+    kept: List[str] = []
+    used = 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line + "\n")
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept).strip()
+
+def select_sections(
+    sections: List[Tuple[str, str]],
+    reference_terms: Set[str],
+    budget: int,
+    priorities: Optional[Dict[str, float]] = None
+) -> str:
+    """Keep the most relevant sections within `budget` tokens, in their original order"""
+    priorities = priorities or {}
+    scored = []
+    for position, (name, text) in enumerate(sections):
+        section_terms = terms(text)
+        overlap = len(section_terms & reference_terms) / (len(section_terms) ** 0.5 or 1.0)
+        scored.append((priorities.get(name, 0.0) + overlap, position))
+
+    chosen: Dict[int, str] = {}
+    remaining = budget
+    for score, position in sorted(scored, key=lambda item: (-item[0], item[1])):
+        text = render_section(*sections[position])
+        cost = estimate_tokens(text)
+        if cost <= remaining:
+            chosen[position] = text
+            remaining -= cost
+        elif score > 0 and remaining >= 50:
+            # Partially keep a relevant section that does not fit whole
+            partial = _truncate_to_tokens(text, remaining)
+            if partial:
+                chosen[position] = partial
+                remaining -= estimate_tokens(partial)
+    return "\n\n".join(chosen[position] for position in sorted(chosen))
+
+def compact_prompt_documents(
+    resume: str,
+    job_description: str,
+    resume_budget: Optional[int] = PROMPT_RESUME_TOKEN_BUDGET,
+    job_budget: Optional[int] = PROMPT_JOB_TOKEN_BUDGET,
+    resume_sections: Optional[Dict[str, str]] = None,
+    keep_sections: Iterable[str] = ()
+) -> Tuple[str, str, Dict[str, int]]:
+    """Return (resume, job description, report) compacted for a prompt.
+
+    A budget of None leaves that document's content whole (the job description
+    still loses its boilerplate); use it where the document is rewritten, such
+    as the resume when tailoring. `resume_sections` are the resume's stored
+    sections (see resume_store), parsed from the text when not given.
+    `keep_sections` are boilerplate job sections to keep, such as COMPANY_SECTIONS
+    for a cover letter; they rank like preferred qualifications. The report
+    counts estimated tokens before and after, and tokens saved.
+    """
+    keep_sections = set(keep_sections)
+    job_sections = strip_boilerplate(split_job_sections(job_description), keep_sections)
+    stripped_job = "\n\n".join(render_section(name, text) for name, text in job_sections)
+    job_terms = terms(stripped_job)
+
+    if resume_budget is None or estimate_tokens(resume) <= resume_budget:
+        compact_resume = resume
+    else:
+        sections = list((resume_sections or parse_resume_sections(resume)).items())
+        compact_resume = select_sections(sections, job_terms, resume_budget, {"header": 1.0, "skills": 1.0})
+
+    if job_budget is None or estimate_tokens(stripped_job) <= job_budget:
+        compact_job = stripped_job
+    else:
+        priorities = {**{name: 1.0 for name in keep_sections}, **JOB_SECTION_PRIORITY}
+        compact_job = select_sections(job_sections, terms(resume), job_budget, priorities)
+
+    # Never send an empty document because every section was dropped
+    compact_resume = compact_resume or resume
+    compact_job = compact_job or job_description
+
+    original = estimate_tokens(resume) + estimate_tokens(job_description)
+    compacted = estimate_tokens(compact_resume) + estimate_tokens(compact_job)
+    report = {"original_tokens": original, "compacted_tokens": compacted, "tokens_saved": original - compacted}
+    return compact_resume, compact_job, report
+
+def prompt_tokens_saved(label: str, report: Dict[str, int], added_text: str = "") -> int:
+    """Tokens the sent prompt saved, counting text added back into it (such as the candidate profile).
+
+    Logged only when the prompt actually got smaller; never negative.
+    """
+    saved = report["tokens_saved"] - (estimate_tokens(added_text) if added_text else 0)
+    if saved <= 0:
+        return 0
+    print(f"Prompt compaction ({label}): saved {saved} tokens")
+    return saved
@@ -0,0 +1,97 @@
+"""Persistent content-hash cache for deterministic resume LLM results.
+
+Results live in a local SQLite file (WAL mode) so every uvicorn worker on the
+host shares them and they survive restarts.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RESUME_CACHE_PATH = os.getenv("RESUME_CACHE_PATH", "cache/resume_cache.sqlite3")
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", str(30 * 24 * 60 * 60)))
+RESUME_CACHE_ENABLED = os.getenv("RESUME_CACHE_ENABLED", "true").lower() != "false"
+
+_initialized = False
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    directory = os.path.dirname(RESUME_CACHE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(RESUME_CACHE_PATH, timeout=10)
+    if not _initialized:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resume_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        connection.commit()
+        _initialized = True
+    return connection
+
+def normalize_resume_text(text: str) -> str:
+    """Collapse whitespace so re-uploads of the same resume hash identically"""
+    return " ".join(text.split())
+
+def resume_cache_key(kind: str, content: Any, model: str, prompt_version: str) -> str:
+    """Hash of the result kind, model, prompt version and normalized input"""
+    if isinstance(content, str):
+        normalized = normalize_resume_text(content)
+    else:
+        normalized = json.dumps(content, sort_keys=True)
+    digest = hashlib.sha256()
+    for part in (kind, model, prompt_version, normalized):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _get(key: str) -> Optional[Dict[str, Any]]:
+    with closing(_connect()) as connection:
+        row = connection.execute(
+            "SELECT value, created_at FROM resume_cache WHERE key = ?", (key,)
+        ).fetchone()
+    if not row or row[1] + RESUME_CACHE_TTL <= time.time():
+        return None
+    return json.loads(row[0])
+
+def _set(key: str, kind: str, value: Dict[str, Any]) -> None:
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO resume_cache (key, kind, value, created_at) VALUES (?, ?, ?, ?)",
+            (key, kind, json.dumps(value), time.time()),
+        )
+
+async def resume_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Look up a cached result (SQLite I/O runs off the event loop)"""
+    if not RESUME_CACHE_ENABLED:
+        return None
+    try:
+        return await asyncio.to_thread(_get, key)
+    except sqlite3.Error as e:
+        print(f"Resume cache read error: {e}")
+        return None
+
+async def resume_cache_set(key: str, kind: str, value: Dict[str, Any]) -> None:
+    """Store a result (SQLite I/O runs off the event loop)"""
+    if not RESUME_CACHE_ENABLED:
+        return
+    try:
+        await asyncio.to_thread(_set, key, kind, value)
+    except sqlite3.Error as e:
+        print(f"Resume cache write error: {e}")
@@ -0,0 +1,194 @@
+"""Shared store of parsed resumes, addressed by a content-hash ID.
+
+A resume is stored once with its sections and (after analysis) the structure
+extracted by analytics.extract_resume_data. Other endpoints can then take a
+`resume_id` instead of the full text. Like the resume cache, it lives in a local
+SQLite file (WAL mode) shared by every worker on the host.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from app.resume_cache import normalize_resume_text
+
+load_dotenv()
+
+RESUME_STORE_PATH = os.getenv("RESUME_STORE_PATH", "cache/resume_store.sqlite3")
+RESUME_STORE_TTL = float(os.getenv("RESUME_STORE_TTL", str(30 * 24 * 60 * 60)))
+
+# Headings that start a resume section, mapped to a canonical section name
+SECTION_HEADINGS = {
+    "summary": "summary", "profile": "summary", "professional summary": "summary", "objective": "summary", "about me": "summary",
+    "experience": "experience", "work experience": "experience", "professional experience": "experience",
+    "employment history": "experience", "work history": "experience",
+    "education": "education", "academic background": "education",
+    "skills": "skills", "technical skills": "skills", "core competencies": "skills", "key skills": "skills",
+    "projects": "projects", "personal projects": "projects",
+    "certifications": "certifications", "certificates": "certifications", "licenses": "certifications",
+    "awards": "awards", "achievements": "awards", "honors": "awards",
+    "publications": "publications", "languages": "languages", "interests": "interests", "hobbies": "interests",
+    "volunteer": "volunteer", "volunteer experience": "volunteer", "references": "references",
+}
+_HEADING_PATTERN = re.compile(r"^[\s#*\-•]*([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$")
+
+_initialized = False
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    directory = os.path.dirname(RESUME_STORE_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    connection = sqlite3.connect(RESUME_STORE_PATH, timeout=10)
+    if not _initialized:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resumes (
+                id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                extraction TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        connection.commit()
+        _initialized = True
+    return connection
+
+def resume_id_for(text: str) -> str:
+    """Content-hash ID: re-uploads of the same resume get the same ID"""
+    return hashlib.sha256(normalize_resume_text(text).encode("utf-8")).hexdigest()[:32]
+
+def parse_resume_sections(text: str) -> Dict[str, str]:
+    """Split a resume into sections by heading lines; text before the first heading is "header" """
+    sections: Dict[str, list] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        match = _HEADING_PATTERN.match(line)
+        heading = SECTION_HEADINGS.get(match.group(1).strip().lower()) if match else None
+        if heading:
+            current = heading
+            sections.setdefault(current, [])
+        else:
+            sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+def _row_to_record(row) -> Dict[str, Any]:
+    return {
+        "resume_id": row[0],
+        "text": row[1],
+        "sections": json.loads(row[2]),
+        "extraction": json.loads(row[3]) if row[3] else None,
+        "created_at": row[4],
+    }
+
+def _get(resume_id: str) -> Optional[Dict[str, Any]]:
+    with closing(_connect()) as connection:
+        row = connection.execute(
+            "SELECT id, text, sections, extraction, created_at FROM resumes WHERE id = ?", (resume_id,)
+        ).fetchone()
+    if not row or row[4] + RESUME_STORE_TTL <= time.time():
+        return None
+    return _row_to_record(row)
+
+def _store(resume_id: str, text: str, sections: Dict[str, str]) -> None:
+    # Storing again refreshes the TTL but keeps an existing extraction
+    with closing(_connect()) as connection, connection:
+        connection.execute(
+            "INSERT INTO resumes (id, text, sections, created_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at",
+            (resume_id, text, json.dumps(sections), time.time()),
+        )
+
+def _set_extraction(resume_id: str, extraction: Dict[str, Any]) -> None:
+    with closing(_connect()) as connection, connection:
+        connection.execute("UPDATE resumes SET extraction = ? WHERE id = ?", (json.dumps(extraction), resume_id))
+
+async def store_resume(text: str) -> Dict[str, Any]:
+    """Store a resume (if new) and return its record"""
+    resume_id = resume_id_for(text)
+    try:
+        await asyncio.to_thread(_store, resume_id, text, parse_resume_sections(text))
+        record = await asyncio.to_thread(_get, resume_id)
+    except sqlite3.Error as e:
+        print(f"Resume store write error: {e}")
+        record = None
+    return record or {"resume_id": resume_id, "text": text, "sections": parse_resume_sections(text), "extraction": None}
+
+async def get_resume(resume_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return await asyncio.to_thread(_get, resume_id)
+    except sqlite3.Error as e:
+        print(f"Resume store read error: {e}")
+        return None
+
+async def set_resume_extraction(resume_id: str, extraction: Dict[str, Any]) -> None:
+    try:
+        await asyncio.to_thread(_set_extraction, resume_id, extraction)
+    except sqlite3.Error as e:
+        print(f"Resume store write error: {e}")
+
+async def _require_resume(resume_id: Optional[str]) -> Dict[str, Any]:
+    if not resume_id:
+        raise HTTPException(status_code=400, detail="Provide the resume text or a resume_id")
+    record = await get_resume(resume_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Resume not found - store it again via /api/analytics/resumes")
+    return record
+
+async def resolve_resume_text(resume_text: Optional[str], resume_id: Optional[str]) -> str:
+    """Resume text from the request, or from the store when only an ID is given"""
+    if resume_text:
+        return resume_text
+    return (await _require_resume(resume_id))["text"]
+
+async def resolve_resume(resume_text: Optional[str], resume_id: Optional[str]) -> Dict[str, Any]:
+    """Resume record for a request: text, sections and (when already analyzed) the extraction.
+
+    Text sent in full is looked up by its content hash too, so a resume analyzed
+    earlier reuses its stored extraction without an ID.
+    """
+    if not resume_text:
+        return await _require_resume(resume_id)
+    record = await get_resume(resume_id_for(resume_text))
+    if record is None:
+        return {"resume_id": None, "text": resume_text, "sections": parse_resume_sections(resume_text), "extraction": None}
+    if record["text"] != resume_text:
+        # Same normalized content, different whitespace: keep the request's text
+        record = {**record, "text": resume_text, "sections": parse_resume_sections(resume_text)}
+    return record
+
+def extracted_skills(extraction: Optional[Dict[str, Any]]) -> List[str]:
+    """Skills and technologies from a stored extraction"""
+    if not extraction:
+        return []
+    return [str(skill) for skill in (extraction.get("skills") or []) + (extraction.get("technologies") or [])]
+
+# Extraction fields shown to the model as the candidate profile, with their labels
+PROFILE_FIELDS = (
+    ("current_role", "Current role"), ("career_level", "Career level"), ("experience_years", "Years of experience"),
+    ("skills", "Skills"), ("technologies", "Technologies"), ("certifications", "Certifications"),
+    ("previous_roles", "Previous roles"), ("industries", "Industries"), ("education", "Education"),
+    ("achievements", "Achievements"),
+)
+
+def format_resume_profile(extraction: Optional[Dict[str, Any]]) -> str:
+    """The stored extraction as short labelled lines for a prompt ("" when there is none)"""
+    lines = []
+    for field, label in PROFILE_FIELDS:
+        value = (extraction or {}).get(field)
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        if value not in (None, ""):
+            lines.append(f"{label}: {value}")
+    return "\n".join(lines)
@@ -1,24 +1,19 @@
 from fastapi import APIRouter, HTTPException
-import requests
 import os
+from app.adzuna_client import adzuna_get
+from app.snapshots import SnapshotScheduler
 
 router = APIRouter()
 
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
 ADZUNA_API_KEY = os.getenv("ADZUNA_API_KEY")
 
-@router.get("/adzuna/health")
-async def adzuna_health():
-    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
-        return {"adzuna_configured": False, "status": "missing_credentials"}
-    return {"adzuna_configured": True, "status": "healthy"}
+# Landing-page aggregates are refreshed in the background and served from memory
+ADZUNA_SNAPSHOT_INTERVAL = float(os.getenv("ADZUNA_SNAPSHOT_INTERVAL", "900"))
 
-@router.get("/adzuna/top-companies")
-async def get_top_companies():
-    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
-        raise HTTPException(status_code=500, detail="Adzuna API credentials are not set")
-    
-    url = "https://api.adzuna.com/v1/api/jobs/us/search/1"
+snapshots = SnapshotScheduler()
+
+async def fetch_developer_jobs():
     params = {
         "app_id": ADZUNA_APP_ID,
         "app_key": ADZUNA_API_KEY,
@@ -26,69 +21,82 @@ async def get_top_companies():
         "what": "developer",
         "content-type": "application/json"
     }
-    response = requests.get(url, params=params, timeout=10)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch data from Adzuna")
-    
-    data = response.json()
+    status, data = await adzuna_get("jobs/us/search/1", params, use_cache=False)
+    if status != 200:
+        raise HTTPException(status_code=status, detail="Failed to fetch data from Adzuna")
+
     companies = list(set([job.get("company", {}).get("display_name") for job in data.get("results", []) if job.get("company")]))
     return {"top_companies": companies[:5]}
 
-@router.get("/adzuna/trending-industries")
-async def get_trending_industries():
-    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
-        raise HTTPException(status_code=500, detail="Adzuna API credentials are not set")
-    
-    url = "https://api.adzuna.com/v1/api/categories"
+async def fetch_categories():
     params = {
         "app_id": ADZUNA_APP_ID,
         "app_key": ADZUNA_API_KEY,
         "content-type": "application/json"
     }
-    response = requests.get(url, params=params, timeout=10)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch categories from Adzuna")
-    
-    data = response.json()
-    categories = [cat.get("label") for cat in data.get("results", []) if cat.get("label")]
-    return {"trending_industries": categories[:5]}
+    status, data = await adzuna_get("categories", params, use_cache=False)
+    if status != 200:
+        raise HTTPException(status_code=status, detail="Failed to fetch categories from Adzuna")
 
-@router.get("/adzuna/hot-categories")
-async def get_hot_categories():
-    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
-        raise HTTPException(status_code=500, detail="Adzuna API credentials are not set")
-    
-    url = "https://api.adzuna.com/v1/api/categories"
-    params = {
-        "app_id": ADZUNA_APP_ID,
-        "app_key": ADZUNA_API_KEY,
-        "content-type": "application/json"
-    }
-    response = requests.get(url, params=params, timeout=10)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch categories from Adzuna")
-    
-    data = response.json()
     categories = [cat.get("label") for cat in data.get("results", []) if cat.get("label")]
-    return {"hot_categories": categories[5:10]}
+    return {
+        "trending_industries": categories[:5],
+        "hot_categories": categories[5:10]
+    }
 
-@router.get("/adzuna/market-insights")
-async def get_market_insights():
-    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
-        raise HTTPException(status_code=500, detail="Adzuna API credentials are not set")
-    
-    url = "https://api.adzuna.com/v1/api/jobs/us/history"
+async def fetch_market_insights():
     params = {
         "app_id": ADZUNA_APP_ID,
         "app_key": ADZUNA_API_KEY,
         "what": "software developer",
         "content-type": "application/json"
     }
-    response = requests.get(url, params=params, timeout=10)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail="Failed to fetch market insights from Adzuna")
-    
-    data = response.json()
+    status, data = await adzuna_get("jobs/us/history", params, use_cache=False)
+    if status != 200:
+        raise HTTPException(status_code=status, detail="Failed to fetch market insights from Adzuna")
+
     return {"market_insights": data.get("results", [])}
 
+snapshots.register("top_companies", fetch_developer_jobs, ADZUNA_SNAPSHOT_INTERVAL)
+snapshots.register("categories", fetch_categories, ADZUNA_SNAPSHOT_INTERVAL)
+snapshots.register("market_insights", fetch_market_insights, ADZUNA_SNAPSHOT_INTERVAL)
+
+def start_adzuna_snapshots():
+    """Start the background refresh loops (safe to call more than once)"""
+    if ADZUNA_APP_ID and ADZUNA_API_KEY:
+        snapshots.start()
+
+async def stop_adzuna_snapshots():
+    await snapshots.stop()
+
+async def read_snapshot(name: str) -> dict:
+    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
+        raise HTTPException(status_code=500, detail="Adzuna API credentials are not set")
+
+    # Refresh loops start with the first view if the app lifespan didn't start them
+    start_adzuna_snapshots()
+    return await snapshots.get(name)
+
+@router.get("/adzuna/health")
+async def adzuna_health():
+    if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
+        return {"adzuna_configured": False, "status": "missing_credentials"}
+    return {"adzuna_configured": True, "status": "healthy", "snapshots": snapshots.status()}
+
+@router.get("/adzuna/top-companies")
+async def get_top_companies():
+    return await read_snapshot("top_companies")
 
+@router.get("/adzuna/trending-industries")
+async def get_trending_industries():
+    categories = await read_snapshot("categories")
+    return {"trending_industries": categories["trending_industries"]}
+
+@router.get("/adzuna/hot-categories")
+async def get_hot_categories():
+    categories = await read_snapshot("categories")
+    return {"hot_categories": categories["hot_categories"]}
+
+@router.get("/adzuna/market-insights")
+async def get_market_insights():
+    return await read_snapshot("market_insights")
@@ -1,24 +1,49 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-import openai
+from typing import Optional, List, Dict, Any, Tuple, Union, AsyncIterator
 import os
 import json
+import asyncio
 import re
-import tempfile
 from dotenv import load_dotenv
-import PyPDF2
-from docx import Document
+from app.document_text import extract_text, UnsupportedDocumentError
+from app.llm_clients import get_openai_client
+from app.resume_cache import resume_cache_key, resume_cache_get, resume_cache_set
+from app.resume_store import store_resume, get_resume, set_resume_extraction, resolve_resume_text
 
 load_dotenv()
 
 router = APIRouter()
 
-# Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Model and prompt versions are part of the resume cache key - bump a version when its prompt changes
+ANALYTICS_MODEL = "gpt-4-turbo"
+EXTRACTION_PROMPT_VERSION = "1"
+INSIGHTS_PROMPT_VERSION = "1"
+
+# "two_call" runs extraction then insights; "single_call" gets both from one schema-constrained request.
+# Structured outputs need a model that supports json_schema response formats.
+ANALYTICS_MODES = ("two_call", "single_call")
+ANALYTICS_MODE = os.getenv("ANALYTICS_MODE", "two_call")
+ANALYTICS_STRUCTURED_MODEL = os.getenv("ANALYTICS_STRUCTURED_MODEL", "gpt-4o")
+ANALYSIS_PROMPT_VERSION = "1"
+
+# Uploads larger than this are rejected while being read
+RESUME_MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Text kept from an uploaded resume (~4 characters per token); later pages are not parsed
+RESUME_TEXT_CHAR_BUDGET = int(os.getenv("RESUME_TEXT_CHAR_BUDGET", "24000"))
+
+# Batch analysis: resumes analyzed at once per batch, and the largest batch accepted
+ANALYTICS_BATCH_CONCURRENCY = int(os.getenv("ANALYTICS_BATCH_CONCURRENCY", "4"))
+ANALYTICS_BATCH_MAX_ITEMS = int(os.getenv("ANALYTICS_BATCH_MAX_ITEMS", "500"))
+# Total upload and text bytes a batch may hold in memory while it is analyzed
+ANALYTICS_BATCH_MAX_BYTES = int(os.getenv("ANALYTICS_BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
 
 class ResumeAnalysisRequest(BaseModel):
-    resume_text: str
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None  # From /analytics/resumes, instead of resume_text
+    mode: Optional[str] = None  # "two_call" or "single_call", defaults to ANALYTICS_MODE
 
 class ResumeAnalysisResponse(BaseModel):
     skills: List[str]
@@ -30,56 +55,79 @@ class ResumeAnalysisResponse(BaseModel):
     skill_gaps: List[str]
     salary_insights: Dict[str, Any]
     industry_insights: Dict[str, Any]
+    resume_id: Optional[str] = None
+
+class StoreResumeRequest(BaseModel):
+    resume_text: str
+
+# Fields of a single-call analysis saved to the resume store as its extraction
+SINGLE_CALL_EXTRACTION_FIELDS = ("skills", "experience_years", "current_role", "career_level")
+
+def _strict_object(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": list(properties), "additionalProperties": False}
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
 
-def extract_text_from_file(file: UploadFile) -> str:
+# Mirrors ResumeAnalysisResponse, with the nested shapes documented for /analytics/resume
+RESUME_ANALYSIS_SCHEMA = _strict_object({
+    "skills": _STRING_LIST,
+    "experience_years": {"type": "integer"},
+    "current_role": {"type": "string"},
+    "career_level": {"type": "string"},
+    "market_value": _strict_object({
+        "estimated_salary_min": {"type": "number"},
+        "estimated_salary_max": {"type": "number"},
+        "market_demand": {"type": "string"},
+        "growth_potential": {"type": "string"}
+    }),
+    "recommendations": _STRING_LIST,
+    "skill_gaps": _STRING_LIST,
+    "salary_insights": _strict_object({
+        "current_range": {"type": "string"},
+        "next_level_range": {"type": "string"},
+        "industry_average": {"type": "string"}
+    }),
+    "industry_insights": _strict_object({
+        "trending_skills": _STRING_LIST,
+        "growth_areas": _STRING_LIST,
+        "remote_opportunities": {"type": "string"}
+    })
+})
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an upload in chunks, rejecting it as soon as it exceeds RESUME_MAX_UPLOAD_BYTES"""
+    if file.size is not None and file.size > RESUME_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File too large: the limit is {RESUME_MAX_UPLOAD_BYTES} bytes")
+    
+    content = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        content.extend(chunk)
+        if len(content) > RESUME_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"File too large: the limit is {RESUME_MAX_UPLOAD_BYTES} bytes")
+    return bytes(content)
+
+async def extract_text_from_file(file: UploadFile) -> str:
     """Extract text from uploaded file (PDF, DOCX, TXT)"""
+    return await extract_text_from_bytes(await read_upload(file), file.filename)
+
+async def extract_text_from_bytes(content: bytes, filename: str) -> str:
+    """Extract up to RESUME_TEXT_CHAR_BUDGET characters from a PDF, DOCX or TXT file in the extraction pool"""
     try:
-        # Read file content
-        content = file.file.read()
-        
-        if file.filename.endswith('.pdf'):
-            # Extract text from PDF
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                tmp_file.write(content)
-                tmp_file.flush()
-                
-                with open(tmp_file.name, 'rb') as pdf_file:
-                    pdf_reader = PyPDF2.PdfReader(pdf_file)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
-                
-                os.unlink(tmp_file.name)
-                return text.strip()
-                
-        elif file.filename.endswith(('.docx', '.doc')):
-            # Extract text from DOCX
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-                tmp_file.write(content)
-                tmp_file.flush()
-                
-                doc = Document(tmp_file.name)
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
-                
-                os.unlink(tmp_file.name)
-                return text.strip()
-                
-        elif file.filename.endswith('.txt'):
-            # Extract text from TXT
-            return content.decode('utf-8').strip()
-            
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Please upload PDF, DOCX, or TXT files.")
-            
+        return await extract_text(content, filename, max_chars=RESUME_TEXT_CHAR_BUDGET)
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error extracting text from file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to extract text from file: {str(e)}")
 
-def extract_resume_data(resume_text: str) -> Dict[str, Any]:
+async def extract_resume_data(resume_text: str) -> Dict[str, Any]:
     """Extract structured data from resume text using OpenAI"""
     
+    cache_key = resume_cache_key("extraction", resume_text, ANALYTICS_MODEL, EXTRACTION_PROMPT_VERSION)
+    cached = await resume_cache_get(cache_key)
+    if cached:
+        return cached
+    
     extraction_prompt = f"""
     Analyze this resume and extract the following information in JSON format:
     
@@ -103,8 +151,12 @@ def extract_resume_data(resume_text: str) -> Dict[str, Any]:
     """
     
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4-turbo",
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        response = await openai_client.chat.completions.create(
+            model=ANALYTICS_MODEL,
             messages=[{"role": "user", "content": extraction_prompt}],
             max_tokens=1000,
             temperature=0.1
@@ -115,14 +167,22 @@ def extract_resume_data(resume_text: str) -> Dict[str, Any]:
         # Remove any markdown formatting
         content = content.replace("```json", "").replace("```", "").strip()
         
-        return json.loads(content)
+        resume_data = json.loads(content)
+        if resume_data:
+            await resume_cache_set(cache_key, "extraction", resume_data)
+        return resume_data
     except Exception as e:
         print(f"Error extracting resume data: {e}")
         return {}
 
-def analyze_career_insights(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+async def analyze_career_insights(resume_data: Dict[str, Any]) -> Dict[str, Any]:
     """Generate career insights and recommendations"""
     
+    cache_key = resume_cache_key("insights", resume_data, ANALYTICS_MODEL, INSIGHTS_PROMPT_VERSION)
+    cached = await resume_cache_get(cache_key)
+    if cached:
+        return cached
+    
     analysis_prompt = f"""
     As a career coach, analyze this resume data and provide insights:
     
@@ -162,8 +222,12 @@ def analyze_career_insights(resume_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     
     try:
-        response = openai_client.chat.completions.create(
-            model="gpt-4-turbo",
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
+        
+        response = await openai_client.chat.completions.create(
+            model=ANALYTICS_MODEL,
             messages=[{"role": "user", "content": analysis_prompt}],
             max_tokens=1500,
             temperature=0.3
@@ -172,77 +236,253 @@ def analyze_career_insights(resume_data: Dict[str, Any]) -> Dict[str, Any]:
         content = response.choices[0].message.content.strip()
         content = content.replace("```json", "").replace("```", "").strip()
         
-        return json.loads(content)
+        insights = json.loads(content)
+        if insights:
+            await resume_cache_set(cache_key, "insights", insights)
+        return insights
     except Exception as e:
         print(f"Error analyzing career insights: {e}")
         return {}
 
-@router.post("/analytics/resume", response_model=ResumeAnalysisResponse)
-def analyze_resume(request: ResumeAnalysisRequest):
-    """Analyze resume and provide career insights"""
+async def analyze_resume_single_call(resume_text: str) -> Dict[str, Any]:
+    """Extract resume data and career insights in one structured-output call"""
+    
+    cache_key = resume_cache_key("analysis", resume_text, ANALYTICS_STRUCTURED_MODEL, ANALYSIS_PROMPT_VERSION)
+    cached = await resume_cache_get(cache_key)
+    if cached:
+        return cached
+    
+    analysis_prompt = f"""
+    As a career coach, analyze this resume. Extract the candidate's skills, total years
+    of experience, current role and career level, then provide their market value,
+    salary insights, recommendations, skill gaps and industry insights.
+    
+    Resume text:
+    {resume_text}
+    """
     
     try:
-        # Extract structured data from resume
-        resume_data = extract_resume_data(request.resume_text)
+        openai_client = get_openai_client()
+        if not openai_client:
+            raise Exception("OpenAI API key not configured")
         
-        if not resume_data:
-            raise HTTPException(status_code=400, detail="Failed to extract resume data")
+        response = await openai_client.chat.completions.create(
+            model=ANALYTICS_STRUCTURED_MODEL,
+            messages=[{"role": "user", "content": analysis_prompt}],
+            max_tokens=2000,
+            temperature=0.2,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "resume_analysis", "strict": True, "schema": RESUME_ANALYSIS_SCHEMA}
+            }
+        )
         
-        # Generate career insights
-        insights = analyze_career_insights(resume_data)
+        message = response.choices[0].message
+        if message.refusal:
+            raise Exception(f"Model refused: {message.refusal}")
         
-        # Combine data for response
-        return ResumeAnalysisResponse(
-            skills=resume_data.get("skills", []),
-            experience_years=resume_data.get("experience_years", 0),
-            current_role=resume_data.get("current_role", ""),
-            career_level=resume_data.get("career_level", ""),
-            market_value=insights.get("market_value", {}),
-            recommendations=insights.get("recommendations", []),
-            skill_gaps=insights.get("skill_gaps", []),
-            salary_insights=insights.get("salary_insights", {}),
-            industry_insights=insights.get("industry_insights", {})
-        )
+        analysis = json.loads(message.content)
+        if analysis:
+            await resume_cache_set(cache_key, "analysis", analysis)
+        return analysis
+    except Exception as e:
+        print(f"Error analyzing resume in one call: {e}")
+        return {}
+
+def resolve_analytics_mode(mode: Optional[str]) -> str:
+    mode = mode or ANALYTICS_MODE
+    if mode not in ANALYTICS_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown analysis mode: {mode}")
+    return mode
+
+async def analyze_resume_text(resume_text: str, mode: Optional[str] = None) -> ResumeAnalysisResponse:
+    """Analyze one resume: extraction then career insights, or a single structured call.
+
+    The resume is added to the resume store so later requests can use its `resume_id`.
+    """
+    resume = await store_resume(resume_text)
+    if resolve_analytics_mode(mode) == "single_call":
+        analysis = await analyze_resume_single_call(resume_text)
+        if not analysis:
+            raise HTTPException(status_code=400, detail="Failed to analyze resume")
+        if resume["extraction"] is None:
+            # Keep a fuller two-call extraction if there is one
+            await set_resume_extraction(resume["resume_id"], {field: analysis[field] for field in SINGLE_CALL_EXTRACTION_FIELDS})
+        return ResumeAnalysisResponse(**analysis, resume_id=resume["resume_id"])
+    
+    # Extract structured data from resume
+    resume_data = await extract_resume_data(resume_text)
+    
+    if not resume_data:
+        raise HTTPException(status_code=400, detail="Failed to extract resume data")
+    if resume["extraction"] != resume_data:
+        await set_resume_extraction(resume["resume_id"], resume_data)
+    
+    # Generate career insights
+    insights = await analyze_career_insights(resume_data)
+    
+    # Combine data for response
+    return ResumeAnalysisResponse(
+        skills=resume_data.get("skills", []),
+        experience_years=resume_data.get("experience_years", 0),
+        current_role=resume_data.get("current_role", ""),
+        career_level=resume_data.get("career_level", ""),
+        market_value=insights.get("market_value", {}),
+        recommendations=insights.get("recommendations", []),
+        skill_gaps=insights.get("skill_gaps", []),
+        salary_insights=insights.get("salary_insights", {}),
+        industry_insights=insights.get("industry_insights", {}),
+        resume_id=resume["resume_id"]
+    )
+
+@router.post("/analytics/resume", response_model=ResumeAnalysisResponse)
+async def analyze_resume(request: ResumeAnalysisRequest):
+    """Analyze resume and provide career insights"""
+    
+    mode = resolve_analytics_mode(request.mode)
+    resume_text = await resolve_resume_text(request.resume_text, request.resume_id)
+    try:
+        return await analyze_resume_text(resume_text, mode)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume analysis failed: {str(e)}")
 
 @router.post("/analytics/resume-upload", response_model=ResumeAnalysisResponse)
-async def analyze_resume_upload(file: UploadFile = File(...)):
+async def analyze_resume_upload(file: UploadFile = File(...), mode: Optional[str] = Form(None)):
     """Analyze uploaded resume file and provide career insights"""
     
+    mode = resolve_analytics_mode(mode)
     try:
         # Extract text from uploaded file
-        resume_text = extract_text_from_file(file)
+        resume_text = await extract_text_from_file(file)
         
         if not resume_text:
             raise HTTPException(status_code=400, detail="No text found in uploaded file")
         
-        # Extract structured data from resume
-        resume_data = extract_resume_data(resume_text)
-        
-        if not resume_data:
-            raise HTTPException(status_code=400, detail="Failed to extract resume data")
-        
-        # Generate career insights
-        insights = analyze_career_insights(resume_data)
-        
-        # Combine data for response
-        return ResumeAnalysisResponse(
-            skills=resume_data.get("skills", []),
-            experience_years=resume_data.get("experience_years", 0),
-            current_role=resume_data.get("current_role", ""),
-            career_level=resume_data.get("career_level", ""),
-            market_value=insights.get("market_value", {}),
-            recommendations=insights.get("recommendations", []),
-            skill_gaps=insights.get("skill_gaps", []),
-            salary_insights=insights.get("salary_insights", {}),
-            industry_insights=insights.get("industry_insights", {})
-        )
+        return await analyze_resume_text(resume_text, mode)
         
+    except HTTPException as e:
+        if e.status_code == 413:
+            raise
+        raise HTTPException(status_code=500, detail=f"Resume analysis failed: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Resume analysis failed: {str(e)}")
 
+async def store_and_extract(resume_text: str) -> Dict[str, Any]:
+    """Store a resume, extract its structure once, and return the record without its text"""
+    resume = await store_resume(resume_text)
+    if resume["extraction"] is None:
+        extraction = await extract_resume_data(resume_text)
+        if extraction:
+            await set_resume_extraction(resume["resume_id"], extraction)
+            resume["extraction"] = extraction
+    return {key: value for key, value in resume.items() if key != "text"}
+
+@router.post("/analytics/resumes")
+async def create_resume(request: StoreResumeRequest):
+    """Store a resume for reuse by ID across analytics, help-me-apply and tailor"""
+    if not request.resume_text.strip():
+        raise HTTPException(status_code=400, detail="Resume text is empty")
+    return await store_and_extract(request.resume_text)
+
+@router.post("/analytics/resumes/upload")
+async def create_resume_upload(file: UploadFile = File(...)):
+    """Store an uploaded resume for reuse by ID"""
+    resume_text = await extract_text_from_file(file)
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="No text found in uploaded file")
+    return await store_and_extract(resume_text)
+
+@router.get("/analytics/resumes/{resume_id}")
+async def read_resume(resume_id: str):
+    """Stored resume: text, sections and extracted structure"""
+    resume = await get_resume(resume_id)
+    if resume is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return resume
+
+async def analyze_batch_item(index: int, name: str, content: Union[str, bytes, HTTPException], mode: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """Analyze one batch entry; failures become an error record instead of failing the batch"""
+    async with semaphore:
+        try:
+            if isinstance(content, HTTPException):
+                raise content
+            if isinstance(content, bytes):
+                resume_text = await extract_text_from_bytes(content, name)
+            else:
+                resume_text = content
+            if not resume_text.strip():
+                raise HTTPException(status_code=400, detail="No resume text found")
+            
+            analysis = await analyze_resume_text(resume_text, mode)
+            return {"type": "result", "index": index, "name": name, "analysis": analysis.model_dump()}
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            print(f"Batch item {index} ({name}) failed: {detail}")
+            return {"type": "error", "index": index, "name": name, "detail": detail}
+
+async def stream_batch_analysis(items: List[Tuple[str, Union[str, bytes, HTTPException]]], mode: str) -> AsyncIterator[str]:
+    """Emit one NDJSON record per resume as it finishes, then a summary"""
+    semaphore = asyncio.Semaphore(ANALYTICS_BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(analyze_batch_item(index, name, content, mode, semaphore))
+        for index, (name, content) in enumerate(items)
+    ]
+    succeeded = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            record = await next_result
+            if record["type"] == "result":
+                succeeded += 1
+            yield json.dumps(record) + "\n"
+        
+        yield json.dumps({"type": "summary", "total": len(items), "succeeded": succeeded, "failed": len(items) - succeeded}) + "\n"
+    finally:
+        # Client disconnected: stop analyses that have not finished
+        for task in tasks:
+            task.cancel()
+
+@router.post("/analytics/resume/batch")
+async def analyze_resume_batch(
+    files: List[UploadFile] = File(default=[]),
+    resume_texts: List[str] = Form(default=[]),
+    mode: Optional[str] = Form(None)
+):
+    """Analyze many resumes (uploaded files and/or `resume_texts` form fields).
+
+    At most ANALYTICS_BATCH_CONCURRENCY resumes are analyzed at once. The response
+    is NDJSON: a {"type": "result"} or {"type": "error"} record per resume, in
+    completion order and tagged with its `index`, then one {"type": "summary"}.
+    """
+    
+    mode = resolve_analytics_mode(mode)
+    if not files and not resume_texts:
+        raise HTTPException(status_code=400, detail="No resumes provided")
+    if len(files) + len(resume_texts) > ANALYTICS_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Too many resumes: at most {ANALYTICS_BATCH_MAX_ITEMS} per batch")
+    
+    too_large = HTTPException(status_code=413, detail=f"Batch too large: the limit is {ANALYTICS_BATCH_MAX_BYTES} bytes in total")
+    total_bytes = sum(len(text.encode("utf-8")) for text in resume_texts)
+    if total_bytes > ANALYTICS_BATCH_MAX_BYTES:
+        raise too_large
+    items: List[Tuple[str, Union[str, bytes, HTTPException]]] = [
+        (f"resume_texts[{index}]", text) for index, text in enumerate(resume_texts)
+    ]
+    # Uploads are closed once this handler returns, so read them before streaming
+    for file in files:
+        try:
+            content = await read_upload(file)
+        except HTTPException as e:
+            # Reported as this item's error record
+            content = e
+        else:
+            total_bytes += len(content)
+            if total_bytes > ANALYTICS_BATCH_MAX_BYTES:
+                raise too_large
+        items.append((file.filename or "upload", content))
+    
+    return StreamingResponse(stream_batch_analysis(items, mode), media_type="application/x-ndjson")
+
 @router.get("/analytics/health")
 def analytics_health():
     """Check if analytics service is working"""
@@ -2,15 +2,15 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import os
 import json
-import requests
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError as e:
-    print(f"OpenAI import failed: {e}")
-    OPENAI_AVAILABLE = False
-    OpenAI = None
-from typing import List, Dict, Any
+import asyncio
+import openai
+from app.adzuna_client import adzuna_get
+from app.llm_clients import get_openai_client, get_perplexity_client
+from app.sse import sse_event, sse_response
+from app.perplexity_cache import cached_perplexity_search
+from app.job_index import index_adzuna_results
+from app.intents import match_message
+from typing import List, Dict, Any, Tuple, AsyncIterator
 
 router = APIRouter()
 
@@ -24,15 +24,12 @@ ADZUNA_API_KEY = os.getenv("ADZUNA_API_KEY")
 
 # Perplexity configuration
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
+# sonar-pro web searches regularly take well over 10 seconds
+PERPLEXITY_TIMEOUT = float(os.getenv("PERPLEXITY_TIMEOUT", "30"))
 
-# Initialize client as None - will be created when needed
-client = None
-
-def get_openai_client():
-    """Get OpenAI client, creating it if needed"""
-    if OPENAI_API_KEY and OPENAI_AVAILABLE:
-        return OpenAI(api_key=OPENAI_API_KEY)
-    return None
+# Max seconds to wait for Adzuna + Perplexity before building the prompt without them.
+# Defaults to the Perplexity timeout so web results are not dropped by default.
+CHAT_GATHER_TIMEOUT = float(os.getenv("CHAT_GATHER_TIMEOUT", str(PERPLEXITY_TIMEOUT)))
 
 class ChatMessage(BaseModel):
     role: str  # "user" or "assistant"
@@ -51,24 +48,8 @@ class ChatResponse(BaseModel):
 
 def extract_career_terms(message: str) -> List[str]:
     """Extract potential career/job terms from user message"""
-    career_keywords = [
-        'engineer', 'developer', 'data scientist', 'analyst', 'manager', 'designer',
-        'marketing', 'sales', 'finance', 'accounting', 'nurse', 'teacher', 'lawyer',
-        'doctor', 'researcher', 'consultant', 'product', 'operations', 'hr',
-        'human resources', 'software', 'web', 'mobile', 'frontend', 'backend',
-        'full stack', 'devops', 'cloud', 'ai', 'machine learning', 'cyber',
-        'security', 'project', 'business', 'strategy', 'content', 'writer',
-        'journalist', 'editor', 'photographer', 'artist', 'musician', 'actor',
-        'astronaut', 'pilot', 'mechanic', 'electrician', 'plumber', 'chef',
-        'architect', 'engineer', 'scientist', 'researcher'
-    ]
-    
     message_lower = message.lower()
-    found_terms = []
-    
-    for keyword in career_keywords:
-        if keyword in message_lower:
-            found_terms.append(keyword)
+    found_terms = match_message(message)["career_term"]
     
     # If no specific terms found, try to extract general career-related words
     if not found_terms:
@@ -80,7 +61,7 @@ def extract_career_terms(message: str) -> List[str]:
     
     return found_terms[:3]  # Return top 3 terms
 
-def fetch_adzuna_market_data(terms: List[str]) -> Dict[str, Any]:
+async def fetch_adzuna_market_data(terms: List[str]) -> Dict[str, Any]:
     """Fetch market insights from Adzuna for given career terms"""
     if not ADZUNA_APP_ID or not ADZUNA_API_KEY or not terms:
         return {}
@@ -98,7 +79,6 @@ def fetch_adzuna_market_data(terms: List[str]) -> Dict[str, Any]:
             primary_term = terms[0]
             
             # Fetch job search data for salary insights
-            url = "https://api.adzuna.com/v1/api/jobs/us/search/1"
             params = {
                 "app_id": ADZUNA_APP_ID,
                 "app_key": ADZUNA_API_KEY,
@@ -107,10 +87,10 @@ def fetch_adzuna_market_data(terms: List[str]) -> Dict[str, Any]:
                 "content-type": "application/json"
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
+            status, data = await adzuna_get("jobs/us/search/1", params)
+            if status == 200:
                 jobs = data.get("results", [])
+                index_adzuna_results(jobs)
                 
                 # Extract companies
                 companies = list(set([
@@ -147,18 +127,31 @@ def fetch_adzuna_market_data(terms: List[str]) -> Dict[str, Any]:
     
     return market_data
 
-def fetch_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
-    """Fetch web search results from Perplexity API"""
-    if not PERPLEXITY_API_KEY:
+# Perplexity search options for coaching research
+PERPLEXITY_SEARCH_PARAMS = {
+    "search_mode": "pro",  # Upgraded to Pro Search
+    "search_focus": "academic",  # Higher quality results
+    "max_results": 15,  # More comprehensive coverage
+    "search_recency_filter": "6months"  # Better recency filtering
+}
+
+async def fetch_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
+    """Fetch web search results from Perplexity API (cached by recency)"""
+    return await cached_perplexity_search(
+        "coach",
+        message,
+        PERPLEXITY_SEARCH_PARAMS,
+        lambda: request_perplexity_web_results(message),
+        should_cache=bool
+    )
+
+async def request_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
+    """Query Perplexity for career research on the user's message"""
+    perplexity_client = get_perplexity_client()
+    if not perplexity_client:
         return []
     
     try:
-        url = "https://api.perplexity.ai/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
         # Create a more focused search prompt
         search_prompt = f"Find recent career trends and insights about: {message}. Include salary data, job market trends, and industry developments."
         
@@ -176,19 +169,18 @@ def fetch_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
             ],
             "max_tokens": 800,  # Increased for richer responses
             "temperature": 0.1,  # Lower temperature for more focused results
-            "extra_body": {
-                "search_mode": "pro",  # Upgraded to Pro Search
-                "search_focus": "academic",  # Higher quality results
-                "max_results": 15,  # More comprehensive coverage
-                "search_recency_filter": "6months"  # Better recency filtering
-            }
+            "extra_body": PERPLEXITY_SEARCH_PARAMS
         }
         
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        # Raw POST over the shared client keeps the payload shape and dict-based parsing below
+        data = await perplexity_client.post(
+            "/chat/completions",
+            body=payload,
+            cast_to=object,
+            options={"timeout": PERPLEXITY_TIMEOUT}
+        )
         
-        if response.status_code == 200:
-            data = response.json()
-            
+        if data:
             content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
             search_results = data.get("search_results", [])
             citations = data.get("choices", [{}])[0].get("message", {}).get("citations", [])
@@ -236,10 +228,10 @@ def fetch_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
             
             return web_results[:5]  # Return top 5 results
             
-    except requests.exceptions.Timeout:
+    except openai.APITimeoutError:
         print("Perplexity API timeout - continuing without web search results")
         return []
-    except requests.exceptions.RequestException as e:
+    except openai.APIError as e:
         print(f"Perplexity API request error: {e}")
         return []
     except Exception as e:
@@ -248,6 +240,55 @@ def fetch_perplexity_web_results(message: str) -> List[Dict[str, Any]]:
     
     return []
 
+async def iter_chat_context(message: str, career_terms: List[str]) -> AsyncIterator[Tuple[str, Any]]:
+    """Fetch Adzuna market data and Perplexity web results concurrently.
+
+    Yields ("market_data", dict) and ("web_results", list) as each source finishes.
+    Waits at most CHAT_GATHER_TIMEOUT seconds; a source that has not finished (or
+    failed) by then is cancelled and yielded empty so the prompt can be built without it.
+    """
+    tasks = {
+        asyncio.create_task(fetch_adzuna_market_data(career_terms)): "market_data",
+        asyncio.create_task(fetch_perplexity_web_results(message)): "web_results",
+    }
+    empty = {"market_data": {}, "web_results": []}
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CHAT_GATHER_TIMEOUT
+    pending = set(tasks)
+    
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(deadline - loop.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                source = tasks[task]
+                if task.exception():
+                    print(f"{source} failed before gather deadline - dropping it: {task.exception()}")
+                    yield source, empty[source]
+                else:
+                    yield source, task.result()
+        
+        for task in pending:
+            source = tasks[task]
+            print(f"{source} not ready before gather deadline - dropping it")
+            yield source, empty[source]
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def gather_chat_context(message: str, career_terms: List[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Collect both chat data sources under the gather deadline (see iter_chat_context)"""
+    context = {"market_data": {}, "web_results": []}
+    async for source, value in iter_chat_context(message, career_terms):
+        context[source] = value
+    return context["market_data"], context["web_results"]
+
 def synthesize_web_results(web_results: List[Dict[str, Any]]) -> str:
     """Synthesize web results into structured insights before sending to LLM"""
     if not web_results:
@@ -383,8 +424,51 @@ RULES:
     
     return f"{system_prompt}{market_context}\n\nUser's current question: {user_message}{context}\n\n{web_context}"
 
+def extract_next_steps(reply: str) -> List[str]:
+    """Pull the "Next Steps" bullet points out of a coaching reply"""
+    next_steps = []
+    
+    # Look for next steps in the response
+    lines = reply.split('\n')
+    in_next_steps = False
+    
+    for line in lines:
+        line = line.strip()
+        if 'next steps' in line.lower() or 'action items' in line.lower():
+            in_next_steps = True
+            continue
+        elif line.startswith('#') or line.startswith('**'):
+            in_next_steps = False
+            continue
+        elif in_next_steps and line.startswith('-'):
+            next_steps.append(line[1:].strip())
+    
+    return next_steps
+
+def build_sources(web_results: List[Dict[str, Any]], market_data: Dict[str, Any]) -> List[str]:
+    """Build the sources list from web search results and Adzuna market data"""
+    sources = []
+    
+    # Build sources list with web search results (these have actual URLs)
+    if web_results:
+        for i, result in enumerate(web_results[:5], 1):  # Show top 5 sources
+            # Extract title from content (first 50 chars) or use section
+            title = result.get('content', '')[:50] + "..." if len(result.get('content', '')) > 50 else result.get('content', '')
+            if result.get('url'):
+                sources.append(f"{i}. {title} - {result.get('url')}")
+            else:
+                sources.append(f"{i}. {title} - Perplexity Search")
+    
+    # Add market data sources
+    if market_data.get('top_companies'):
+        sources.append(f"Top hiring companies: {', '.join(market_data['top_companies'][:3])}")
+    if market_data.get('salary_insights'):
+        sources.append("Salary data from Adzuna job market")
+    
+    return sources
+
 @router.post("/chat")
-def chat_with_coach(request: ChatRequest):
+async def chat_with_coach(request: ChatRequest):
     """Chat with career coach - Perplexity-style responses with market data"""
     
     client = get_openai_client()
@@ -396,10 +480,8 @@ def chat_with_coach(request: ChatRequest):
         career_terms = extract_career_terms(request.message)
         print(f"Extracted career terms: {career_terms}")
         
-        market_data = fetch_adzuna_market_data(career_terms)
+        market_data, web_results = await gather_chat_context(request.message, career_terms)
         print(f"Market data fetched: {bool(market_data)}")
-        
-        web_results = fetch_perplexity_web_results(request.message)
         print(f"Web results fetched: {len(web_results)} results")
         
         # Generate enhanced prompt with both market data and web results
@@ -413,7 +495,7 @@ def chat_with_coach(request: ChatRequest):
         # Debug: Print a sample of the prompt being sent to AI
         print(f"DEBUG - Prompt sample (last 500 chars): {prompt[-500:]}")
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": prompt},
@@ -425,40 +507,8 @@ def chat_with_coach(request: ChatRequest):
         
         reply = response.choices[0].message.content
         
-        # Extract structured information (simple parsing)
-        sources = []
-        next_steps = []
-        
-        # Look for next steps in the response
-        lines = reply.split('\n')
-        in_next_steps = False
-        
-        for line in lines:
-            line = line.strip()
-            if 'next steps' in line.lower() or 'action items' in line.lower():
-                in_next_steps = True
-                continue
-            elif line.startswith('#') or line.startswith('**'):
-                in_next_steps = False
-                continue
-            elif in_next_steps and line.startswith('-'):
-                next_steps.append(line[1:].strip())
-        
-        # Build sources list with web search results (these have actual URLs)
-        if web_results:
-            for i, result in enumerate(web_results[:5], 1):  # Show top 5 sources
-                # Extract title from content (first 50 chars) or use section
-                title = result.get('content', '')[:50] + "..." if len(result.get('content', '')) > 50 else result.get('content', '')
-                if result.get('url'):
-                    sources.append(f"{i}. {title} - {result.get('url')}")
-                else:
-                    sources.append(f"{i}. {title} - Perplexity Search")
-        
-        # Add market data sources
-        if market_data.get('top_companies'):
-            sources.append(f"Top hiring companies: {', '.join(market_data['top_companies'][:3])}")
-        if market_data.get('salary_insights'):
-            sources.append("Salary data from Adzuna job market")
+        next_steps = extract_next_steps(reply)
+        sources = build_sources(web_results, market_data)
         
         return {
             "reply": reply,
@@ -498,6 +548,57 @@ Would you like to try the job search feature instead? It's working perfectly and
             "web_results": []
         }
 
+@router.post("/chat/stream")
+async def chat_with_coach_stream(request: ChatRequest):
+    """Stream a coaching reply as Server-Sent Events.
+
+    `market_data` and `web_results` events arrive as each source finishes, then
+    `sources`, the reply as `token` events, `next_steps`, and finally `done`.
+    """
+    
+    client = get_openai_client()
+    if not client:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    async def events():
+        try:
+            career_terms = extract_career_terms(request.message)
+            
+            context = {"market_data": {}, "web_results": []}
+            async for source, value in iter_chat_context(request.message, career_terms):
+                context[source] = value
+                yield sse_event(source, value)
+            
+            market_data, web_results = context["market_data"], context["web_results"]
+            yield sse_event("sources", build_sources(web_results, market_data)[:5])
+            
+            prompt = get_career_coaching_prompt(request.message, request.conversation_history, market_data, web_results)
+            stream = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": request.message}
+                ],
+                max_tokens=1200,
+                temperature=0.7,
+                stream=True
+            )
+            
+            reply_parts = []
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    reply_parts.append(chunk.choices[0].delta.content)
+                    yield sse_event("token", {"content": chunk.choices[0].delta.content})
+            
+            yield sse_event("next_steps", extract_next_steps("".join(reply_parts))[:3])
+            yield sse_event("done", {})
+        
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield sse_event("error", {"message": str(e)})
+    
+    return sse_response(events())
+
 @router.get("/chat/health")
 def chat_health():
     """Check if OpenAI and Perplexity are configured"""
@@ -1,16 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
-import openai
-import os
+from typing import Optional, Tuple
 from dotenv import load_dotenv
+from app.llm_clients import get_openai_client
+from app.resume_store import resolve_resume, resolve_resume_text, extracted_skills, format_resume_profile
+from app.prompt_compaction import compact_prompt_documents, prompt_tokens_saved, PROMPT_RESUME_TOKEN_BUDGET, PROMPT_RESUME_PROFILE_TOKEN_BUDGET
+from app.match_scoring import local_feedback, score_resume_match
 
 load_dotenv()
 
 router = APIRouter()
 
+# "llm": GPT-4 scores and writes the feedback; "fast": local score, LLM feedback only on request
+MATCH_MODES = ("llm", "fast")
+
 class JobAnalysisRequest(BaseModel):
     jobDescription: str
-    resume: str
+    resume: Optional[str] = None
+    resumeId: Optional[str] = None  # From /api/analytics/resumes, instead of resume
+    mode: str = "llm"
+    includeNarrative: bool = False  # Fast mode: have the LLM write improvements/dailyTasks
 
 class JobAnalysisResponse(BaseModel):
     jobTitle: str
@@ -18,22 +27,43 @@ class JobAnalysisResponse(BaseModel):
     improvements: list[str]
     dailyTasks: list[str]
     canTailor: bool
+    promptTokensSaved: int = 0  # Estimated tokens the sent prompt saved by compaction (profile included)
+    matchedSkills: list[str] = []
+    missingSkills: list[str] = []
 
 @router.post("/help-me-apply", response_model=JobAnalysisResponse)
 async def analyze_job_match(request: JobAnalysisRequest):
+    if request.mode not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown mode '{request.mode}'. Use one of: {', '.join(MATCH_MODES)}")
+    # Stored sections and extraction (if the resume was analyzed before) are reused
+    resume = await resolve_resume(request.resume, request.resumeId)
     try:
         # Extract job title from job description
         job_title = extract_job_title(request.jobDescription)
         
-        # Analyze the match between resume and job
-        analysis = await analyze_resume_job_match(request.resume, request.jobDescription)
+        # Local keyword and skill overlap, computed in milliseconds
+        match = score_resume_match(resume["text"], request.jobDescription, resume["sections"], extracted_skills(resume["extraction"]))
+        
+        if request.mode == "fast" and not request.includeNarrative:
+            analysis = {**local_feedback(match), "match_score": match["match_score"], "can_tailor": bool(match["missing_skills"] or match["missing_keywords"])}
+        else:
+            # Analyze the match between resume and job
+            analysis = await analyze_resume_job_match(
+                resume["text"], request.jobDescription, match, resume["sections"], resume["extraction"]
+            )
+            if request.mode == "fast":
+                # The LLM only writes the feedback; the score stays deterministic
+                analysis["match_score"] = match["match_score"]
         
         return JobAnalysisResponse(
             jobTitle=job_title,
             matchScore=analysis["match_score"],
             improvements=analysis["improvements"],
             dailyTasks=analysis["daily_tasks"],
-            canTailor=analysis["can_tailor"]
+            canTailor=analysis["can_tailor"],
+            promptTokensSaved=analysis.get("prompt_tokens_saved", 0),
+            matchedSkills=match["matched_skills"],
+            missingSkills=match["missing_skills"]
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -62,17 +92,38 @@ def extract_job_title(job_description: str) -> str:
     
     return "This Position"
 
-async def analyze_resume_job_match(resume: str, job_description: str) -> dict:
-    """Analyze how well the resume matches the job requirements"""
+async def analyze_resume_job_match(
+    resume: str,
+    job_description: str,
+    match: Optional[dict] = None,
+    sections: Optional[dict] = None,
+    extraction: Optional[dict] = None
+) -> dict:
+    """Analyze how well the resume matches the job requirements.
+
+    `sections` and `extraction` come from the resume store. With an extraction the
+    model gets the candidate profile plus a shorter excerpt of the resume.
+    """
+    
+    profile = format_resume_profile(extraction)
+    resume_budget = PROMPT_RESUME_PROFILE_TOKEN_BUDGET if profile else PROMPT_RESUME_TOKEN_BUDGET
+    # Only the resume and job sections relevant to each other go into the prompt
+    compact_resume, compact_job, compaction = compact_prompt_documents(
+        resume, job_description, resume_budget, resume_sections=sections
+    )
+    profile_block = f"""
+    CANDIDATE PROFILE (extracted from the full resume):
+    {profile}
+""" if profile else ""
     
     prompt = f"""
     Analyze how well this resume matches the job requirements and provide specific, actionable feedback.
 
     JOB DESCRIPTION:
-    {job_description}
-
+    {compact_job}
+{profile_block}
     RESUME:
-    {resume}
+    {compact_resume}
 
     Please provide:
     1. A match score (0-100) based on skills, experience, and qualifications
@@ -105,9 +156,11 @@ async def analyze_resume_job_match(resume: str, job_description: str) -> dict:
     """
 
     try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client()
+        if not client:
+            raise Exception("OpenAI API key not configured")
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are a career coach helping candidates improve their job applications. Provide specific, actionable feedback."},
@@ -124,49 +177,51 @@ async def analyze_resume_job_match(resume: str, job_description: str) -> dict:
             "match_score": result.get("match_score", 50),
             "improvements": result.get("improvements", ["Improve your resume", "Add more details", "Highlight relevant experience"]),
             "daily_tasks": result.get("daily_tasks", ["Take an online course", "Practice relevant skills", "Research industry trends"]),
-            "can_tailor": result.get("can_tailor", True)
+            "can_tailor": result.get("can_tailor", True),
+            "prompt_tokens_saved": prompt_tokens_saved("help-me-apply", compaction, profile_block)
         }
         
     except Exception as e:
-        # Fallback analysis if OpenAI fails
+        # Fallback analysis if OpenAI fails: the local score and template feedback
+        print(f"Match analysis LLM call failed, using local scoring: {e}")
+        match = match or score_resume_match(resume, job_description, sections, extracted_skills(extraction))
         return {
-            "match_score": 60,
-            "improvements": [
-                "Add more specific examples of your achievements",
-                "Include keywords from the job posting",
-                "Highlight relevant skills and experience"
-            ],
-            "daily_tasks": [
-                "Take a free online course on relevant skills (Coursera, edX, or YouTube)",
-                "Practice the required skills with hands-on projects",
-                "Read industry articles and stay updated on trends"
-            ],
+            **local_feedback(match),
+            "match_score": match["match_score"],
             "can_tailor": True
         }
 
 @router.post("/tailor-resume")
-async def tailor_resume(request: dict):
-    """Tailor the resume to better match the job requirements"""
+async def tailor_resume(request: dict, response: Response):
+    """Tailor the resume to better match the job requirements.
+
+    The body stays the tailored resume; the estimated prompt tokens saved by
+    compaction are reported in the X-Prompt-Tokens-Saved header.
+    """
+    resume = await resolve_resume_text(request.get("resume"), request.get("resumeId"))
     try:
         job_description = request.get("jobDescription", "")
-        resume = request.get("resume", "")
         analysis = request.get("analysis", {})
         
-        tailored_resume = await create_tailored_resume(resume, job_description, analysis)
+        tailored_resume, tokens_saved = await create_tailored_resume(resume, job_description, analysis)
+        response.headers["X-Prompt-Tokens-Saved"] = str(tokens_saved)
         
         return tailored_resume
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-async def create_tailored_resume(resume: str, job_description: str, analysis: dict) -> str:
-    """Create a tailored version of the resume"""
+async def create_tailored_resume(resume: str, job_description: str, analysis: dict) -> Tuple[str, int]:
+    """Create a tailored version of the resume; also returns the prompt tokens compaction saved"""
+    
+    # The resume is rewritten, so it stays whole; the job description loses its boilerplate
+    _, compact_job, compaction = compact_prompt_documents(resume, job_description, resume_budget=None)
     
     prompt = f"""
     Tailor this resume to better match the job requirements. Keep the original structure but enhance it to be more relevant to the specific job.
 
     JOB DESCRIPTION:
-    {job_description}
+    {compact_job}
 
     ORIGINAL RESUME:
     {resume}
@@ -186,9 +241,11 @@ async def create_tailored_resume(resume: str, job_description: str, analysis: di
     """
 
     try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_openai_client()
+        if not client:
+            raise Exception("OpenAI API key not configured")
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are a professional resume writer specializing in tailoring resumes for specific job applications."},
@@ -197,8 +254,8 @@ async def create_tailored_resume(resume: str, job_description: str, analysis: di
             temperature=0.3
         )
         
-        return response.choices[0].message.content
+        return response.choices[0].message.content, prompt_tokens_saved("tailor-resume", compaction)
         
     except Exception as e:
-        # Fallback: return original resume with a note
-        return f"{resume}\n\n--- TAILORED FOR THIS POSITION ---\n\nNote: Resume tailoring failed. Please manually incorporate the suggested improvements."
+        # Fallback: return original resume with a note (no prompt was sent)
+        return f"{resume}\n\n--- TAILORED FOR THIS POSITION ---\n\nNote: Resume tailoring failed. Please manually incorporate the suggested improvements.", 0
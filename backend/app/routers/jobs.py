@@ -1,9 +1,18 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional
-import requests
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 import os
+import json
+import base64
+import asyncio
 from dotenv import load_dotenv
+from app.adzuna_client import adzuna_get, adzuna_cache
+from app.cache import AsyncTTLCache
+from app.job_index import process_job, index_jobs_in_background, search_local_jobs, job_index_size, get_indexed_jobs, JOB_INDEX_MIN_RESULTS
+from app.ingestion import ingestion_status
+from app.match_scoring import rank_jobs
+from app.resume_store import resolve_resume_text
 
 load_dotenv()
 
@@ -13,71 +22,306 @@ router = APIRouter()
 ADZUNA_APP_ID = os.getenv("ADZUNA_APP_ID")
 ADZUNA_API_KEY = os.getenv("ADZUNA_API_KEY")
 
+# Search depth configuration: pages 1..N are fetched concurrently and merged.
+# One page (one Adzuna call) by default; requests or config opt into deeper fetches.
+JOBS_RESULTS_PER_PAGE = 50
+JOBS_SEARCH_DEPTH = int(os.getenv("JOBS_SEARCH_DEPTH", "1"))
+JOBS_SEARCH_MAX_DEPTH = int(os.getenv("JOBS_SEARCH_MAX_DEPTH", "10"))
+JOBS_SEARCH_CONCURRENCY = int(os.getenv("JOBS_SEARCH_CONCURRENCY", "4"))
+
+# "adzuna" always searches live; "local" answers from the job index and only goes live for cold queries
+JOBS_SEARCH_SOURCE = os.getenv("JOBS_SEARCH_SOURCE", "adzuna")
+JOBS_SEARCH_SOURCES = ("adzuna", "local")
+
+# Merged result sets that cursors page through
+JOBS_RESULT_SET_TTL = float(os.getenv("JOBS_RESULT_SET_TTL", "600"))
+result_sets = AsyncTTLCache(ttl=JOBS_RESULT_SET_TTL, max_entries=256)
+
+# Ranking by resume similarity
+JOBS_RANK_TOP_K = int(os.getenv("JOBS_RANK_TOP_K", "10"))
+JOBS_RANK_MAX_IDS = int(os.getenv("JOBS_RANK_MAX_IDS", "500"))
+JOBS_RANK_MAX_TOP_K = 100
+
 class JobSearchRequest(BaseModel):
     query: str
     location: Optional[str] = None
+    depth: Optional[int] = None  # Adzuna pages to fetch, defaults to JOBS_SEARCH_DEPTH
+    limit: int = JOBS_RESULTS_PER_PAGE  # Jobs per response page
+    cursor: Optional[str] = None  # next_cursor from a previous response
+    stream: bool = False  # Emit newline-delimited JSON as pages arrive
+    source: Optional[str] = None  # "adzuna" or "local", defaults to JOBS_SEARCH_SOURCE
+
+class JobRankRequest(BaseModel):
+    resume_text: Optional[str] = None
+    resume_id: Optional[str] = None  # From /api/analytics/resumes, instead of resume_text
+    query: Optional[str] = None  # Rank the results of this search...
+    location: Optional[str] = None
+    depth: Optional[int] = None
+    source: Optional[str] = None
+    job_ids: Optional[List[str]] = None  # ...or these indexed jobs
+    top_k: int = Field(JOBS_RANK_TOP_K, ge=1, le=JOBS_RANK_MAX_TOP_K)
+
+def job_identity(job: Dict[str, Any]) -> str:
+    """Key used to deduplicate postings that appear on more than one page"""
+    if job.get("id"):
+        return f"id:{job['id']}"
+    if job.get("url"):
+        return f"url:{job['url']}"
+    return f"{job['title']}|{job['company']}|{job['location']}".lower()
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        decoded = {"q": str(state["q"]), "l": state.get("l"), "d": int(state["d"]), "o": int(state["o"]), "n": int(state["n"]), "s": state.get("s", "adzuna")}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if decoded["s"] not in JOBS_SEARCH_SOURCES:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return decoded
+
+def build_search_params(query: str, location: Optional[str]) -> Dict[str, Any]:
+    # Simple API call - search with separate query and location
+    params = {
+        "app_id": ADZUNA_APP_ID,
+        "app_key": ADZUNA_API_KEY,
+        "what": query,
+        "results_per_page": JOBS_RESULTS_PER_PAGE
+    }
+
+    if location:
+        params["where"] = location
+    else:
+        # If no location provided, search for remote jobs
+        params["what"] = query + " remote"
+
+    return params
+
+async def fetch_search_page(params: Dict[str, Any], page: int, semaphore: asyncio.Semaphore) -> Tuple[int, List[Dict[str, Any]]]:
+    """Fetch one Adzuna results page; a failed page contributes no jobs"""
+    async with semaphore:
+        try:
+            status, data = await adzuna_get(f"jobs/us/search/{page}", params)
+        except Exception as e:
+            print(f"Error fetching page {page}: {e}")
+            return page, []
+
+    if status != 200:
+        print(f"API error on page {page}: {status}")
+        return page, []
+    return page, data.get("results", [])
+
+async def iter_search_pages(query: str, location: Optional[str], depth: int) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Fetch pages 1..depth concurrently, yielding (page, raw jobs) as each one arrives"""
+    params = build_search_params(query, location)
+    semaphore = asyncio.Semaphore(JOBS_SEARCH_CONCURRENCY)
+    tasks = [
+        asyncio.create_task(fetch_search_page(params, page, semaphore))
+        for page in range(1, depth + 1)
+    ]
+    try:
+        for next_page in asyncio.as_completed(tasks):
+            yield await next_page
+    finally:
+        # Consumer stopped early (e.g. client disconnected)
+        for task in tasks:
+            task.cancel()
+
+def local_search_text(query: str, location: Optional[str]) -> str:
+    # Mirror the live search: no location means remote jobs
+    return query if location else query + " remote"
+
+async def fetch_local_jobs(query: str, location: Optional[str], depth: int) -> Optional[List[Dict[str, Any]]]:
+    """Answer a search from the local index, or None when the query is cold"""
+    local_jobs = await search_local_jobs(local_search_text(query, location), location, limit=depth * JOBS_RESULTS_PER_PAGE)
+    if len(local_jobs) < JOB_INDEX_MIN_RESULTS:
+        print(f"Cold local query ({len(local_jobs)} hits) - falling back to Adzuna")
+        return None
+    return local_jobs
+
+async def fetch_merged_jobs(query: str, location: Optional[str], depth: int, source: str = "adzuna") -> List[Dict[str, Any]]:
+    """Fetch every page, then merge them in page order without duplicates"""
+    if source == "local":
+        local_jobs = await fetch_local_jobs(query, location, depth)
+        if local_jobs is not None:
+            return local_jobs
+
+    pages = {}
+    async for page, page_jobs in iter_search_pages(query, location, depth):
+        pages[page] = page_jobs
+
+    processed_jobs = []
+    seen = set()
+    for page in sorted(pages):
+        page_jobs = pages[page]
+        for job in page_jobs:
+            processed_job = process_job(job)
+            identity = job_identity(processed_job)
+            if identity not in seen:
+                seen.add(identity)
+                processed_jobs.append(processed_job)
+
+    index_jobs_in_background(processed_jobs)
+    return processed_jobs
+
+def result_set_key(query: str, location: Optional[str], depth: int, source: str = "adzuna") -> Tuple:
+    return (" ".join(query.lower().split()), (location or "").strip().lower(), depth, source)
+
+async def get_result_set(query: str, location: Optional[str], depth: int, source: str = "adzuna") -> List[Dict[str, Any]]:
+    """Merged results for a search, reused by every cursor page of that search"""
+    return await result_sets.get_or_fetch(
+        result_set_key(query, location, depth, source),
+        lambda: fetch_merged_jobs(query, location, depth, source),
+        should_cache=bool
+    )
+
+def ndjson_line(record: Dict[str, Any]) -> str:
+    return json.dumps(record) + "\n"
+
+async def stream_search_jobs(state: Dict[str, Any]) -> AsyncIterator[str]:
+    """Emit {"type": "job"} records as pages are parsed, then one {"type": "summary"}.
+
+    Only the dedup keys are held in memory; an already-merged result set for the
+    same search is streamed directly instead of refetching.
+    """
+    total = 0
+    try:
+        cached_jobs = result_sets.get(result_set_key(state["q"], state["l"], state["d"], state["s"]))
+        if cached_jobs is None and state["o"]:
+            # Offsets refer to the page-ordered merge, so rebuild it for cursor streams
+            cached_jobs = await get_result_set(state["q"], state["l"], state["d"], state["s"])
+        if cached_jobs is None and state["s"] == "local":
+            cached_jobs = await fetch_local_jobs(state["q"], state["l"], state["d"])
+        if cached_jobs is not None:
+            for job in cached_jobs[state["o"]:]:
+                total += 1
+                yield ndjson_line({"type": "job", "job": job})
+        else:
+            seen = set()
+            async for page, page_jobs in iter_search_pages(state["q"], state["l"], state["d"]):
+                page_processed = []
+                for job in page_jobs:
+                    processed_job = process_job(job)
+                    identity = job_identity(processed_job)
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+                    page_processed.append(processed_job)
+                    total += 1
+                    yield ndjson_line({"type": "job", "job": processed_job})
+                index_jobs_in_background(page_processed)
+
+        print(f"Streamed {total} jobs")
+        yield ndjson_line({"type": "summary", "total": total})
+
+    except Exception as e:
+        print(f"Error: {e}")
+        yield ndjson_line({"type": "error", "detail": str(e), "total": total})
 
 @router.get("/jobs/health")
-def jobs_health():
+async def jobs_health():
     """Check if Adzuna API is configured"""
     return {
         "adzuna_configured": bool(ADZUNA_APP_ID and ADZUNA_API_KEY),
-        "status": "healthy" if (ADZUNA_APP_ID and ADZUNA_API_KEY) else "missing_api_key"
+        "status": "healthy" if (ADZUNA_APP_ID and ADZUNA_API_KEY) else "missing_api_key",
+        "cache": adzuna_cache.stats(),
+        "local_index_jobs": await job_index_size(),
+        "ingestion": ingestion_status()
     }
 
 @router.post("/jobs/search")
-def search_jobs(request: JobSearchRequest):
-    """Search for jobs - COMPLETELY FRESH START"""
-    
+async def search_jobs(request: JobSearchRequest):
+    """Search for jobs across the first `depth` Adzuna pages.
+
+    Returns up to `limit` jobs plus an opaque `next_cursor`; sending it back as
+    `cursor` returns the next slice of the already-fetched result set. With
+    `stream` set, every job from the cursor onwards is sent as NDJSON instead
+    (see stream_search_jobs).
+    """
+
     if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
         raise HTTPException(status_code=500, detail="Adzuna API keys not configured")
-    
+
+    if request.cursor:
+        state = decode_cursor(request.cursor)
+    else:
+        depth = request.depth or JOBS_SEARCH_DEPTH
+        source = request.source or JOBS_SEARCH_SOURCE
+        if source not in JOBS_SEARCH_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Unknown search source: {source}")
+        state = {
+            "q": request.query,
+            "l": request.location,
+            "d": max(1, min(depth, JOBS_SEARCH_MAX_DEPTH)),
+            "o": 0,
+            "n": max(1, request.limit),
+            "s": source
+        }
+
+    print(f"Searching for: '{state['q']}' in '{state['l']}' (depth {state['d']}, offset {state['o']})")
+
+    if request.stream:
+        return StreamingResponse(stream_search_jobs(state), media_type="application/x-ndjson")
+
     try:
-        # Simple API call - search with separate query and location
-        params = {
-            "app_id": ADZUNA_APP_ID,
-            "app_key": ADZUNA_API_KEY,
-            "what": request.query,
-            "results_per_page": 50
+        jobs = await get_result_set(state["q"], state["l"], state["d"], state["s"])
+
+        offset, limit = state["o"], state["n"]
+        page = jobs[offset:offset + limit]
+        next_cursor = None
+        if offset + limit < len(jobs):
+            next_cursor = encode_cursor({**state, "o": offset + limit})
+
+        print(f"Found {len(jobs)} jobs")
+        return {
+            "jobs": page,
+            "total": len(page),
+            "total_available": len(jobs),
+            "next_cursor": next_cursor
         }
-        
-        if request.location:
-            params["where"] = request.location
-        else:
-            # If no location provided, search for remote jobs
-            params["what"] = request.query + " remote"
-        
-        print(f"Searching for: '{request.query}' in '{request.location}'")
-        
-        url = "https://api.adzuna.com/v1/api/jobs/us/search/1"
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            jobs = data.get("results", [])
-            
-            # Simple job processing
-            processed_jobs = []
-            for job in jobs:
-                processed_job = {
-                    "title": job.get("title", ""),
-                    "company": job.get("company", {}).get("display_name", ""),
-                    "location": job.get("location", {}).get("display_name", ""),
-                    "type": job.get("contract_type", ""),
-                    "description": job.get("description", ""),
-                    "url": job.get("redirect_url", ""),
-                    "salary_min": job.get("salary_min"),
-                    "salary_max": job.get("salary_max"),
-                    "posted_at": job.get("created", "")
-                }
-                processed_jobs.append(processed_job)
-            
-            print(f"Found {len(processed_jobs)} jobs")
-            return {"jobs": processed_jobs, "total": len(processed_jobs)}
-        else:
-            print(f"API error: {response.status_code}")
-            return {"jobs": [], "total": 0}
-            
+
     except Exception as e:
         print(f"Error: {e}")
-        return {"jobs": [], "total": 0}
+        return {"jobs": [], "total": 0, "total_available": 0, "next_cursor": None}
+
+@router.post("/jobs/rank")
+async def rank_jobs_by_resume(request: JobRankRequest):
+    """Rank a search's results (or the given job IDs) by similarity to a resume.
+
+    All postings are scored in one TF-IDF cosine pass (see match_scoring.rank_jobs)
+    and the `top_k` best are returned with the terms they share with the resume.
+    """
+    resume = await resolve_resume_text(request.resume_text, request.resume_id)
+
+    missing_ids: List[str] = []
+    if request.job_ids:
+        if len(request.job_ids) > JOBS_RANK_MAX_IDS:
+            raise HTTPException(status_code=400, detail=f"Too many job_ids (max {JOBS_RANK_MAX_IDS})")
+        jobs = await get_indexed_jobs(request.job_ids)
+        found = {job["id"] for job in jobs}
+        missing_ids = [job_id for job_id in dict.fromkeys(request.job_ids) if job_id not in found]
+    elif request.query:
+        source = request.source or JOBS_SEARCH_SOURCE
+        if source not in JOBS_SEARCH_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Unknown search source: {source}")
+        depth = max(1, min(request.depth or JOBS_SEARCH_DEPTH, JOBS_SEARCH_MAX_DEPTH))
+        # A warm local query is ranked straight from the job index, without Adzuna
+        jobs = await fetch_local_jobs(request.query, request.location, depth) if source == "local" else None
+        if jobs is None:
+            if not ADZUNA_APP_ID or not ADZUNA_API_KEY:
+                raise HTTPException(status_code=500, detail="Adzuna API keys not configured")
+            jobs = await get_result_set(request.query, request.location, depth, "adzuna")
+    else:
+        raise HTTPException(status_code=400, detail="Provide a query or job_ids to rank")
+
+    ranked = await asyncio.to_thread(rank_jobs, resume, jobs, request.top_k)
+    print(f"Ranked {len(jobs)} jobs by resume similarity")
+    return {
+        "jobs": ranked,
+        "total": len(ranked),
+        "total_ranked": len(jobs),
+        "missing_ids": missing_ids
+    }
@@ -1,44 +1,37 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from openai import OpenAI
+from typing import Optional, Dict, Tuple
 import os
+import asyncio
 from docx import Document
 from io import BytesIO
 import base64
+from app.llm_clients import get_openai_client
+from app.sse import sse_event, sse_response
+from app.resume_store import resolve_resume, format_resume_profile
+from app.prompt_compaction import compact_prompt_documents, prompt_tokens_saved, COMPANY_SECTIONS, PROMPT_RESUME_TOKEN_BUDGET, PROMPT_RESUME_PROFILE_TOKEN_BUDGET
 
 router = APIRouter()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 
-# OpenAI client will be initialized when needed
-
 class TailorRequest(BaseModel):
     job_description: str
-    resume: str
+    resume: Optional[str] = None
+    resume_id: Optional[str] = None  # From /api/analytics/resumes, instead of resume
 
 class DownloadRequest(BaseModel):
     content: str
 
-@router.post("/tailor/generate")
-def generate_tailored_content(request: TailorRequest):
-    """Generate tailored resume and cover letter"""
-    
-    if not OPENAI_API_KEY:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-    
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    
-    try:
-        # Generate tailored resume
-        resume_prompt = f"""
+def build_resume_prompt(inputs: Dict[str, str]) -> str:
+    return f"""
         You are an expert resume writer. Based on the following job description, tailor this resume to match the requirements and keywords.
         
         Job Description:
-        {request.job_description}
+        {inputs["job_description"]}
         
         Original Resume:
-        {request.resume}
+        {inputs["resume"]}
         
         Please provide a tailored resume that:
         1. Incorporates relevant keywords from the job description
@@ -48,25 +41,23 @@ def generate_tailored_content(request: TailorRequest):
         
         Return only the tailored resume content.
         """
-        
-        resume_response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": resume_prompt}],
-            max_tokens=1500,
-            temperature=0.7
-        )
-        
-        tailored_resume = resume_response.choices[0].message.content
-        
-        # Generate cover letter
-        cover_letter_prompt = f"""
+
+def cover_letter_profile_block(profile: str) -> str:
+    return f"""
+        Candidate Profile (extracted from the full resume):
+        {profile}
+        """ if profile else ""
+
+def build_cover_letter_prompt(inputs: Dict[str, str]) -> str:
+    profile = cover_letter_profile_block(inputs.get("profile", ""))
+    return f"""
         You are an expert cover letter writer. Write a compelling cover letter for this job based on the resume.
         
         Job Description:
-        {request.job_description}
-        
+        {inputs["job_description"]}
+        {profile}
         Resume:
-        {request.resume}
+        {inputs["resume"]}
         
         Please write a cover letter that:
         1. Demonstrates enthusiasm for the role
@@ -76,24 +67,130 @@ def generate_tailored_content(request: TailorRequest):
         
         Return only the cover letter content.
         """
-        
-        cover_letter_response = client.chat.completions.create(
+
+# Document name -> (prompt builder, max_tokens)
+TAILORED_DOCUMENTS = {
+    "tailored_resume": (build_resume_prompt, 1500),
+    "cover_letter": (build_cover_letter_prompt, 800),
+}
+
+async def prepare_prompt_inputs(request: TailorRequest) -> Tuple[Dict[str, Dict[str, str]], int]:
+    """Prompt inputs per document, and the estimated prompt tokens compaction saved"""
+    resume = await resolve_resume(request.resume, request.resume_id)
+    
+    # The resume is rewritten, so it stays whole; the job description loses its boilerplate
+    _, resume_job, resume_compaction = compact_prompt_documents(resume["text"], request.job_description, resume_budget=None)
+    
+    # The cover letter only draws on the relevant parts of the resume, plus the stored profile.
+    # It keeps the company sections so it can show it understands the company.
+    profile = format_resume_profile(resume["extraction"])
+    letter_resume, letter_job, letter_compaction = compact_prompt_documents(
+        resume["text"],
+        request.job_description,
+        PROMPT_RESUME_PROFILE_TOKEN_BUDGET if profile else PROMPT_RESUME_TOKEN_BUDGET,
+        resume_sections=resume["sections"],
+        keep_sections=COMPANY_SECTIONS
+    )
+    
+    inputs = {
+        "tailored_resume": {"job_description": resume_job, "resume": resume["text"]},
+        "cover_letter": {"job_description": letter_job, "resume": letter_resume, "profile": profile},
+    }
+    # The cover letter's profile block goes into its prompt on top of the compacted documents
+    return inputs, (
+        prompt_tokens_saved("tailored resume", resume_compaction)
+        + prompt_tokens_saved("cover letter", letter_compaction, cover_letter_profile_block(profile))
+    )
+
+@router.post("/tailor/generate")
+async def generate_tailored_content(request: TailorRequest):
+    """Generate tailored resume and cover letter"""
+    
+    inputs, tokens_saved = await prepare_prompt_inputs(request)
+    client = get_openai_client()
+    if not client:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    async def generate(document: str) -> str:
+        build_prompt, max_tokens = TAILORED_DOCUMENTS[document]
+        response = await client.chat.completions.create(
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": cover_letter_prompt}],
-            max_tokens=800,
+            messages=[{"role": "user", "content": build_prompt(inputs[document])}],
+            max_tokens=max_tokens,
             temperature=0.7
         )
-        
-        cover_letter = cover_letter_response.choices[0].message.content
+        return response.choices[0].message.content
+    
+    try:
+        # Both prompts only depend on the request, so generate them concurrently
+        tailored_resume, cover_letter = await asyncio.gather(
+            generate("tailored_resume"),
+            generate("cover_letter")
+        )
         
         return {
             "tailored_resume": tailored_resume,
-            "cover_letter": cover_letter
+            "cover_letter": cover_letter,
+            "prompt_tokens_saved": tokens_saved
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
 
+@router.post("/tailor/generate/stream")
+async def stream_tailored_content(request: TailorRequest):
+    """Stream tailored resume and cover letter as interleaved Server-Sent Events.
+
+    Each `token` event carries {"document", "content"}, where document is
+    "tailored_resume" or "cover_letter". A `document_done` event marks the end of
+    each document and `done` the end of the stream.
+    """
+    
+    inputs, _ = await prepare_prompt_inputs(request)
+    client = get_openai_client()
+    if not client:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    async def events():
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def produce(document: str):
+            try:
+                build_prompt, max_tokens = TAILORED_DOCUMENTS[document]
+                stream = await client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=[{"role": "user", "content": build_prompt(inputs[document])}],
+                    max_tokens=max_tokens,
+                    temperature=0.7,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        await queue.put(sse_event("token", {"document": document, "content": chunk.choices[0].delta.content}))
+                await queue.put(sse_event("document_done", {"document": document}))
+            except Exception as e:
+                print(f"Tailor stream error ({document}): {e}")
+                await queue.put(sse_event("error", {"document": document, "message": f"Content generation failed: {str(e)}"}))
+            finally:
+                await queue.put(None)
+        
+        producers = [asyncio.create_task(produce(document)) for document in TAILORED_DOCUMENTS]
+        try:
+            remaining = len(producers)
+            while remaining:
+                event = await queue.get()
+                if event is None:
+                    remaining -= 1
+                    continue
+                yield event
+            yield sse_event("done", {})
+        finally:
+            # Client disconnected mid-stream
+            for producer in producers:
+                producer.cancel()
+    
+    return sse_response(events())
+
 @router.post("/tailor/download")
 def download_document(request: DownloadRequest):
     """Convert text content to DOCX and return as base64"""
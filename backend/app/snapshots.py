@@ -0,0 +1,94 @@
+"""Background-refreshed in-memory snapshots of slow-changing upstream data"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class Snapshot:
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Any]], interval: float):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.value: Any = None
+        self.updated_at: Optional[float] = None
+        self.error: Optional[Exception] = None
+
+class SnapshotScheduler:
+    """Refreshes registered snapshots on an interval and serves them from memory.
+
+    Reads are a dict lookup. When a refresh fails the previous value keeps being
+    served (stale-while-revalidate) and the refresh is retried after
+    `retry_interval` seconds.
+    """
+
+    def __init__(self, retry_interval: float = 60):
+        self.retry_interval = retry_interval
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    def register(self, name: str, fetch: Callable[[], Awaitable[Any]], interval: float) -> None:
+        self._snapshots[name] = Snapshot(name, fetch, interval)
+
+    async def refresh(self, name: str) -> bool:
+        """Refresh one snapshot; concurrent callers share the in-flight fetch"""
+        task = self._refreshing.get(name)
+        if task is None:
+            task = asyncio.create_task(self._refresh(name))
+            self._refreshing[name] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, name: str) -> bool:
+        snapshot = self._snapshots[name]
+        try:
+            snapshot.value = await snapshot.fetch()
+            snapshot.updated_at = time.time()
+            snapshot.error = None
+            return True
+        except Exception as e:
+            print(f"Snapshot refresh failed for {name}: {e}")
+            snapshot.error = e
+            return False
+
+    async def _refresh_loop(self, name: str) -> None:
+        snapshot = self._snapshots[name]
+        while True:
+            ok = await self.refresh(name)
+            await asyncio.sleep(snapshot.interval if ok else min(self.retry_interval, snapshot.interval))
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """Start one refresh loop per snapshot (no-op if already running)"""
+        for name in self._snapshots:
+            if name not in self._tasks or self._tasks[name].done():
+                self._tasks[name] = asyncio.create_task(self._refresh_loop(name))
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    async def get(self, name: str) -> Any:
+        """Return the latest value, loading it on the spot only if none exists yet.
+
+        Raises the last refresh error when no value has ever been loaded.
+        """
+        snapshot = self._snapshots[name]
+        if snapshot.updated_at is None:
+            await self.refresh(name)
+            if snapshot.updated_at is None:
+                raise snapshot.error
+        return snapshot.value
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "updated_at": snapshot.updated_at,
+                "stale": snapshot.error is not None,
+            }
+            for name, snapshot in self._snapshots.items()
+        }
@@ -0,0 +1,20 @@
+"""Helpers for Server-Sent Events (text/event-stream) responses"""
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+# Disable proxy buffering so each event reaches the client as soon as it is written
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one typed SSE event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of formatted events in a streaming response"""
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
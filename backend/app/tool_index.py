@@ -0,0 +1,284 @@
+"""Inverted index over the AI tools catalog with field-weighted BM25 scoring.
+
+The catalog is tokenized once when the index is built. Each posting stores its
+final BM25 contribution, so a query only walks the postings of its own terms
+and its cost does not grow with the catalog size.
+"""
+import asyncio
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Field weights: a hit in the name counts more than one in the description
+FIELD_WEIGHTS = {"name": 3.0, "features": 2.0, "description": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Query terms at least this long also match vocabulary terms they prefix ("edit" -> "editing")
+PREFIX_MIN_LENGTH = 3
+# Synonym expansions count for less than the words the user typed
+SYNONYM_WEIGHT = 0.5
+# Typo tolerance: query terms with no exact or prefix match are matched against
+# vocabulary terms by trigram (Dice) similarity
+FUZZY_MIN_LENGTH = 4
+FUZZY_MIN_SIMILARITY = 0.5
+FUZZY_MAX_EXPANSIONS = 3
+# Extra candidates taken from the top of the ranking to make up for tools whose
+# name is already in the results; widened (doubled) only when it runs out
+SEARCH_HEADROOM = 10
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def tool_fields(tool: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "name": tool.get("name", ""),
+        "features": " ".join(tool.get("features", [])),
+        "description": tool.get("description", ""),
+    }
+
+class ToolIndex:
+    def __init__(self, tools: Iterable[Dict[str, Any]], load_tool: Optional[Callable[[int], Dict[str, Any]]] = None):
+        """Index tools (each carrying its "category") in the order given.
+
+        With `load_tool`, tool dicts are not kept in memory: only the postings,
+        names and categories are, and results are loaded by position on demand.
+        """
+        self.names: List[str] = []
+        self.doc_categories: List[str] = []
+        self._docs: List[Dict[str, Any]] = []
+        self._load_tool = load_tool or self._docs.__getitem__
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._build(tools, keep_docs=load_tool is None)
+        self.vocabulary = sorted(self.postings)
+        self.trigram_postings: Dict[str, List[int]] = self._build_trigrams()
+        self.category_counts: Dict[str, int] = dict(Counter(self.doc_categories))
+        self.categories: List[str] = list(self.category_counts)
+        self.total_tools = len(self.names)
+
+    def _build(self, tools: Iterable[Dict[str, Any]], keep_docs: bool) -> None:
+        weighted_tfs: List[Counter] = []
+        lengths: List[float] = []
+        for doc in tools:
+            self.names.append(doc.get("name", "").lower())
+            self.doc_categories.append(doc.get("category", ""))
+            if keep_docs:
+                self._docs.append(doc)
+            tf: Counter = Counter()
+            length = 0.0
+            for field, text in tool_fields(doc).items():
+                tokens = tokenize(text)
+                weight = FIELD_WEIGHTS[field]
+                length += weight * len(tokens)
+                for token in tokens:
+                    tf[token] += weight
+            weighted_tfs.append(tf)
+            lengths.append(length)
+
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        doc_freq: Counter = Counter()
+        for tf in weighted_tfs:
+            doc_freq.update(tf.keys())
+
+        n = len(self.names)
+        idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+        postings = defaultdict(list)
+        for doc_id, tf in enumerate(weighted_tfs):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / (avg_length or 1.0))
+            for term, weighted_tf in tf.items():
+                postings[term].append((doc_id, idf[term] * weighted_tf * (BM25_K1 + 1) / (weighted_tf + norm)))
+        self.postings = dict(postings)
+
+    def _build_trigrams(self) -> Dict[str, List[int]]:
+        """Trigram -> positions in `vocabulary` of the terms containing it"""
+        trigram_postings = defaultdict(list)
+        for term_id, term in enumerate(self.vocabulary):
+            if len(term) >= FUZZY_MIN_LENGTH - 1:
+                for trigram in trigrams(term):
+                    trigram_postings[trigram].append(term_id)
+        return dict(trigram_postings)
+
+    def fuzzy_terms(self, term: str) -> List[Tuple[str, float]]:
+        """Vocabulary terms most similar to a (likely misspelled) term, with their similarity.
+
+        Cost depends on how many vocabulary terms share a trigram with the query
+        term. A length filter drops terms that cannot reach FUZZY_MIN_SIMILARITY.
+        """
+        if len(term) < FUZZY_MIN_LENGTH:
+            return []
+        query_trigrams = trigrams(term)
+        shared: Counter = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.trigram_postings.get(trigram, ()))
+
+        size = len(query_trigrams)
+        # Dice >= s needs the candidate's trigram count within [size*s/(2-s), size*(2-s)/s]
+        min_size = size * FUZZY_MIN_SIMILARITY / (2 - FUZZY_MIN_SIMILARITY)
+        max_size = size * (2 - FUZZY_MIN_SIMILARITY) / FUZZY_MIN_SIMILARITY
+        matches = []
+        for term_id, common in shared.items():
+            if 2 * common < FUZZY_MIN_SIMILARITY * (size + min_size):
+                continue
+            candidate = self.vocabulary[term_id]
+            # A term of n characters has n trigrams once padded
+            candidate_size = len(candidate)
+            if not min_size <= candidate_size <= max_size:
+                continue
+            similarity = 2 * common / (size + candidate_size)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                matches.append((candidate, similarity))
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:FUZZY_MAX_EXPANSIONS]
+
+    def expand_term(self, term: str) -> Iterable[str]:
+        """The term itself plus vocabulary terms it is a prefix of"""
+        if len(term) < PREFIX_MIN_LENGTH:
+            return [term] if term in self.postings else []
+        matches = []
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            matches.append(self.vocabulary[position])
+            position += 1
+        return matches
+
+    def search(self, query_terms: Dict[str, float], category: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank tools for weighted query terms; one result per tool name.
+
+        The category filter is applied while walking the postings, and only the
+        top `limit + headroom` scores are selected (no full sort), so ranking
+        cost stays proportional to the results wanted.
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        doc_categories = self.doc_categories
+        for term, query_weight in query_terms.items():
+            expansions = [(vocab_term, 1.0) for vocab_term in self.expand_term(term)]
+            if not expansions:
+                expansions = self.fuzzy_terms(term)
+            for vocab_term, similarity in expansions:
+                weight = query_weight * similarity
+                if category:
+                    for doc_id, score in self.postings[vocab_term]:
+                        if doc_categories[doc_id] == category:
+                            scores[doc_id] += weight * score
+                else:
+                    for doc_id, score in self.postings[vocab_term]:
+                        scores[doc_id] += weight * score
+
+        headroom = SEARCH_HEADROOM
+        while True:
+            wanted = limit + headroom
+            # Highest score first, ties by catalog order
+            ranked = heapq.nlargest(wanted, scores.items(), key=lambda item: (item[1], -item[0]))
+            results = []
+            seen_names = set()
+            for doc_id, _ in ranked:
+                name = self.names[doc_id]
+                if name in seen_names:
+                    continue
+                seen_names.add(name)
+                results.append(doc_id)
+                if len(results) >= limit:
+                    break
+            # Duplicate names used up the headroom: widen it, unless every match was considered
+            if len(results) >= limit or wanted >= len(scores):
+                return [dict(self._load_tool(doc_id)) for doc_id in results]
+            headroom *= 2
+
+class ToolCatalog:
+    """Serves a ToolIndex built from a JSON Lines catalog file (one tool per line).
+
+    The file is memory-mapped read-only, so the tool records stay in the shared
+    page cache rather than in each worker's heap; only the index lives in
+    memory. When the file's size, mtime or inode changes, a new index is built
+    off the event loop and swapped in whole, while searches keep using the old
+    one. Publish updates by writing a new file and renaming it over the old one.
+    """
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._index: Optional[ToolIndex] = None
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._reload_task: Optional[asyncio.Task] = None
+        self.reload()
+
+    @staticmethod
+    def _signature_of(stat: os.stat_result) -> Tuple[int, int, int]:
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _build(self) -> Tuple[ToolIndex, Tuple[int, int, int]]:
+        with open(self.path, "rb") as f:
+            signature = self._signature_of(os.fstat(f.fileno()))
+            if signature[1] == 0:
+                return ToolIndex([]), signature
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        spans: List[Tuple[int, int]] = []
+
+        def iter_tools():
+            start = 0
+            while start < len(mapped):
+                end = mapped.find(b"\n", start)
+                if end == -1:
+                    end = len(mapped)
+                line = mapped[start:end].strip()
+                if line:
+                    try:
+                        tool = json.loads(line)
+                    except ValueError:
+                        print(f"Skipping malformed AI tools catalog line at byte {start}")
+                    else:
+                        spans.append((start, end))
+                        yield tool
+                start = end + 1
+
+        def load_tool(doc_id: int) -> Dict[str, Any]:
+            start, end = spans[doc_id]
+            return json.loads(mapped[start:end])
+
+        return ToolIndex(iter_tools(), load_tool=load_tool), signature
+
+    def reload(self) -> None:
+        """Rebuild the index synchronously (used at startup)"""
+        self._index, self._signature = self._build()
+        self._checked_at = time.monotonic()
+        print(f"Loaded {self._index.total_tools} AI tools from {self.path}")
+
+    async def _reload_in_background(self) -> None:
+        try:
+            index, signature = await asyncio.to_thread(self._build)
+        except Exception as e:
+            # Keep serving the previous index
+            print(f"AI tools catalog reload failed: {e}")
+            return
+        self._index, self._signature = index, signature
+        print(f"Reloaded {index.total_tools} AI tools from {self.path}")
+
+    @property
+    def index(self) -> ToolIndex:
+        """Current index; schedules a rebuild if the file changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            try:
+                changed = self._signature_of(os.stat(self.path)) != self._signature
+            except OSError:
+                changed = False
+            if changed and (self._reload_task is None or self._reload_task.done()):
+                try:
+                    self._reload_task = asyncio.get_running_loop().create_task(self._reload_in_background())
+                except RuntimeError:
+                    # No event loop (e.g. a script): rebuild inline
+                    self.reload()
+        return self._index
@@ -0,0 +1,19 @@
+from app.intents import match_message
+from app.routers.chat import extract_career_terms
+
+
+def test_career_terms_match_word_endings():
+    assert match_message("I want to get into engineering")["career_term"] == ["engineer"]
+    assert match_message("Is cybersecurity a good field?")["career_term"] == ["cyber"]
+    assert match_message("Are nurses in demand?")["career_term"] == ["nurse"]
+
+
+def test_short_terms_stay_whole_words():
+    assert match_message("What should I aim for?")["career_term"] == []
+    assert match_message("Jobs in AI")["career_term"] == ["ai"]
+    assert match_message("I know")["conversational"] == []
+
+
+def test_career_terms_follow_keyword_priority():
+    assert match_message("software engineer salaries")["career_term"] == ["engineer", "software"]
+    assert extract_career_terms("How do I become a software engineer?")[0] == "engineer"
@@ -0,0 +1,32 @@
+from app.match_scoring import extract_skills, local_feedback, score_resume_match
+
+JOB = """Backend Developer
+Requirements
+- Python and SQL
+- Docker and Kubernetes
+Responsibilities
+- You are ready to go from day one and excel in a fast-paced environment
+- Build services with the rest of the team
+"""
+
+RESUME = """Sam Lee
+Skills
+Python, SQL, Docker, Kubernetes
+Experience
+Built backend services in Python with SQL databases, shipped with Docker on Kubernetes.
+Worked in a fast-paced environment from day one as part of a backend team.
+"""
+
+
+def test_everyday_words_are_not_required_skills():
+    match = score_resume_match(RESUME, JOB)
+    assert match["missing_skills"] == []
+    assert match["match_score"] >= 70
+    assert not any("go" in task.split() for task in local_feedback(match)["daily_tasks"])
+
+
+def test_ambiguous_skills_count_in_context():
+    assert extract_skills("Golang services behind REST APIs, reports in Microsoft Excel") == ["golang", "rest apis", "excel"]
+    assert extract_skills("Go, REST, Excel, Spring", skill_list=True) == ["golang", "rest apis", "excel", "spring boot"]
+    match = score_resume_match("Skills\nGo, REST", "Requirements\n- Golang and RESTful services")
+    assert match["matched_skills"] == ["golang", "rest apis"]
@@ -0,0 +1,59 @@
+import random
+from collections import defaultdict
+
+from app.routers.ai_tools import build_query_terms
+from app.tool_index import ToolIndex
+
+WORDS = ["writing", "code", "design", "image", "video", "data", "chart", "email", "seo", "audio", "editing", "analytics"]
+CATEGORIES = ["Writing", "Coding", "Design", "Data"]
+
+
+def make_index(count=3000):
+    rng = random.Random(7)
+    tools = [
+        {
+            # Few distinct names, so the name dedup has to skip many candidates
+            "name": f"Tool {rng.randrange(count // 20)}",
+            "category": rng.choice(CATEGORIES),
+            "description": " ".join(rng.choices(WORDS, k=8)),
+            "features": rng.sample(WORDS, 2),
+        }
+        for _ in range(count)
+    ]
+    return ToolIndex(tools)
+
+
+def full_sort_search(index, query_terms, category=None, limit=10):
+    """Reference ranking: fully sort every match, then filter and dedup"""
+    scores = defaultdict(float)
+    for term, query_weight in query_terms.items():
+        expansions = [(vocab_term, 1.0) for vocab_term in index.expand_term(term)] or index.fuzzy_terms(term)
+        for vocab_term, similarity in expansions:
+            for doc_id, score in index.postings[vocab_term]:
+                scores[doc_id] += query_weight * similarity * score
+    results, seen_names = [], set()
+    for doc_id, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+        if category and index.doc_categories[doc_id] != category:
+            continue
+        if index.names[doc_id] in seen_names:
+            continue
+        seen_names.add(index.names[doc_id])
+        results.append(index._load_tool(doc_id))
+        if len(results) >= limit:
+            break
+    return results
+
+
+def test_search_matches_full_sort_ranking():
+    index = make_index()
+    for query in ["writing", "data chart", "ai tools for design", "edit video", "analytcs"]:
+        for category in [None, "Data"]:
+            for limit in [1, 10, 60]:
+                terms = build_query_terms(query)
+                assert index.search(terms, category, limit) == full_sort_search(index, terms, category, limit)
+
+
+def test_keyword_mapping_needs_a_whole_word():
+    assert "artificial" not in build_query_terms("email marketing")
+    assert "artificial" in build_query_terms("ai writing")
+    assert "image" in build_query_terms("designer")